@@ -311,6 +311,8 @@ TASK 2: IP ACCESS CONTROL VALIDATION
    Create a list detailing each attempt, marking it as "allowed" or "blocked" (e.g.,
    `{"ip": "192.168.1.1", "status": "allowed"}` or `{"ip": "203.0.113.42", "status": "blocked"}`).
    (Store this list of dictionaries in the global variable `ip_validation_results`.)
+   (Going further: `IPAccessIndex` in ip_access_index.py also accepts CIDR blocks such as
+   "10.0.0.0/8" and checks each attempt without scanning the whole whitelist.)
 
 TASK 3: USER LOGIN PATTERN ANALYSIS
    Analyze the `recent_logins` list.
@@ -319,6 +321,8 @@ TASK 3: USER LOGIN PATTERN ANALYSIS
    and values are their login counts.)
    Second, identify users who have logged in more than 2 times.
    (Store a list of these high-activity usernames in the global list `high_activity_users_list`.)
+   (Going further: `LoginActivityTracker` in login_analytics.py counts logins in batches as
+   they arrive and can bound its memory for endless streams.)
 
 TASK 4: CONTINUOUS MONITORING CYCLES
    Simulate three cycles of a continuous monitoring process.
@@ -44,9 +44,10 @@ FILE I/O CONCEPTS WE'LL COVER:
 - Processing common cybersecurity file formats
 """
 import os
-import re
 from datetime import datetime
 
+import log_scanner
+
 # ============================================================================
 # CONCEPT EXPLANATION: Basic File Reading (Conceptual - prints are illustrative)
 # ============================================================================
@@ -75,29 +76,9 @@ with open("conceptual_security_config.txt", "r") as file:
 # ============================================================================
 # HELPER FUNCTIONS (These might be used by your main exercise functions)
 # ============================================================================
-def analyze_security_log(log_filename): # This helper is used by main exercise
-    stats = {
-        "total_entries": 0,
-        "by_severity": {"INFO": 0, "WARNING": 0, "ERROR": 0, "CRITICAL": 0},
-        "failed_logins": 0, "suspicious_ips": set(), "critical_events": []
-    }
-    if not os.path.exists(log_filename): return stats
-    try:
-        with open(log_filename, "r") as log_file:
-            for line in log_file:
-                line = line.strip()
-                if not line: continue
-                stats["total_entries"] += 1
-                for sev in stats["by_severity"].keys():
-                    if sev in line: stats["by_severity"][sev] += 1; break
-                if "failed login" in line.lower(): stats["failed_logins"] += 1
-                ips = re.findall(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b', line)
-                if ips and ("failed" in line.lower() or "suspicious" in line.lower()):
-                    stats["suspicious_ips"].update(ips)
-                if "CRITICAL" in line: stats["critical_events"].append(line)
-    except Exception: pass
-    stats["suspicious_ips"] = list(stats["suspicious_ips"])
-    return stats
+def analyze_security_log(log_filename, **scan_options): # This helper is used by main exercise
+    # Streaming scanner with parallel, bounded, checkpointed and compressed-input modes: see log_scanner.py
+    return log_scanner.analyze_security_log(log_filename, **scan_options)
 
 # ============================================================================
 # WARM-UP EXERCISES: Practice File Operations
@@ -193,6 +174,8 @@ TOOL 1: USER ACCOUNT DATA PROCESSOR
      - "admin_users": A list of usernames for users whose role is "admin" or "administrator" (case-insensitive).
    Error Handling: If the file is not found or a significant parsing error occurs (e.g., incorrect CSV format
                    that prevents basic processing), return `None`.
+   Going Further: `security_files.process_user_list` streams the CSV and adds "count"/"sample" modes
+                  and spilling the username lists to disk for very large user exports.
 
 TOOL 2: SECURITY ALERT FILTERING SYSTEM
    Function Name: `process_security_alerts`
@@ -204,6 +187,8 @@ TOOL 2: SECURITY ALERT FILTERING SYSTEM
          output file should be formatted as: "ALERT: [timestamp] - [severity] - [source] - [description]".
    Output: Return the count of high-priority alerts that were processed and written to the report.
    Error Handling: If any file operation fails, return -1.
+   Going Further: `security_files.process_security_alerts` writes the report in large batches (optionally
+                  atomically), and `security_files.process_security_alerts_many` merges several sensor files.
 
 TOOL 3: CONFIGURATION MANAGEMENT TOOL
    Function Name: `update_security_config`
@@ -216,6 +201,8 @@ TOOL 3: CONFIGURATION MANAGEMENT TOOL
          content back to the `config_filepath`, overwriting the original.
    Output: Return `True` if the update process completes successfully.
    Error Handling: Return `False` if any file operation fails.
+   Going Further: `security_files.update_security_config` streams the file into a locked temporary copy
+                  that atomically replaces the original, so a crash never leaves a half-written config.
 
 TOOL 4: LOG ARCHIVE SYSTEM
    Function Name: `archive_old_logs`
@@ -230,6 +217,8 @@ TOOL 4: LOG ARCHIVE SYSTEM
    Output: Return a list of filenames that were successfully archived.
    Error Handling: If the `source_directory` doesn't exist or other major file operation errors occur,
                    return an empty list. Individual file read errors should be skipped, and archiving should continue if possible.
+   Going Further: `security_files.archive_old_logs` also archives rotated logs such as "auth.log.gz"
+                  by decompressing them straight into the archive.
 
 TOOL 5: SECURITY METRICS ANALYZER
    Function Name: `generate_metrics_report`
@@ -245,6 +234,8 @@ TOOL 5: SECURITY METRICS ANALYZER
            "active_user_percentage": ..., "admin_user_count": ..., "total_alerts": ...,
            "high_priority_alert_count": ..., "critical_alert_count": ...}`).
    Error Handling: If essential input files are missing or major processing fails, return an empty dictionary.
+   Going Further: `security_files.generate_metrics_report` counts all three alert metrics in one pass and
+                  reuses the counts from earlier full passes over input files that have not changed.
 """
 
 # YOUR CODE GOES HERE
@@ -369,6 +360,30 @@ print("\n" + "="*50)
 print("RUNNING TESTS...")
 print("="*50)
 
+TEST_FILES = ["users.csv", "alerts.txt", "config.ini", "filtered_alerts.txt",
+              "warmup_test.txt", "warmup_servers.txt"]
+
+def setup_test_files():
+    """Create the sample input files used by the built-in tests."""
+    with open("users.csv", "w") as f:
+        f.write("username,role,email,last_login_date,status\n"
+                "admin_user,admin,admin@example.com,2023-10-01,active\n"
+                "regular_user,user,user@example.com,2023-09-28,active\n"
+                "old_user,user,old@example.com,2022-01-15,inactive\n")
+    with open("alerts.txt", "w") as f:
+        f.write("2023-10-01T09:30:00Z|CRITICAL|dc-01|Ransomware signature detected\n"
+                "2023-10-01T09:35:00Z|HIGH|firewall-01|Suspicious outbound connection\n"
+                "2023-10-01T09:40:00Z|LOW|web-01|Certificate expires in 60 days\n")
+    with open("config.ini", "w") as f:
+        f.write("# Security settings\nsetting1=value1\nsetting2=old_value\n")
+
+def cleanup_test_files():
+    """Remove files created by the built-in tests."""
+    for f_name in TEST_FILES:
+        if os.path.exists(f_name):
+            try: os.remove(f_name)
+            except OSError: pass
+
 def test_warmup_file_io():
     warmup_passed = 0
     total_warmup_tests = 4
@@ -0,0 +1,210 @@
+"""
+====================================================================
+BRUTE-FORCE DETECTOR ⏱️ - Failed logins over a sliding window
+====================================================================
+
+Standalone helper related to Module 3 (ACCOUNT SECURITY MONITORING).
+
+The Module 3 exercise looks at one static "failed login attempts" number.
+In production that number should be "failures in the last few minutes", and
+it should be re-counted as every login event arrives. BruteForceDetector
+keeps, per account and per source IP, a ring buffer of failure counts (one
+slot per `resolution` seconds of the window). Recording an event and expiring
+old failures are O(1) (amortized), so an attack crosses the threshold seconds
+after it starts instead of whenever the next batch job runs.
+
+Run `python brute_force_detector.py` for the built-in checks and
+`python brute_force_detector.py --benchmark` for event throughput.
+"""
+
+import random
+import sys
+import time
+from array import array
+
+from env_settings import benchmark_scale
+
+DEFAULT_FAILURE_THRESHOLD = 10 # More failures than this inside the window is flagged
+
+class FailureWindow:
+    """Failures in the last `slots` time slots, as a ring buffer with a running total."""
+    __slots__ = ("counts", "current_slot", "last_failure_slot", "total")
+
+    def __init__(self, slots, current_slot):
+        self.counts = array("I", bytes(4 * slots))
+        self.current_slot = current_slot
+        self.last_failure_slot = current_slot
+        self.total = 0
+
+    def advance(self, slot):
+        """Expire every slot older than the window ending at `slot`."""
+        elapsed = slot - self.current_slot
+        if elapsed <= 0: return
+        counts = self.counts
+        size = len(counts)
+        if slot - self.last_failure_slot >= size: # Nothing left in the window
+            if self.total: counts[:] = array("I", bytes(4 * size))
+            self.total = 0
+        elif elapsed <= 8: # Usual case: a few slots since the last event
+            for expired in range(self.current_slot + 1, slot + 1):
+                index = expired % size
+                self.total -= counts[index]
+                counts[index] = 0
+        else: # Clear the expired stretch (which may wrap around) with slice assignments
+            start = (self.current_slot + 1) % size
+            end = start + elapsed
+            counts[start:min(end, size)] = array("I", bytes(4 * (min(end, size) - start)))
+            if end > size: counts[:end - size] = array("I", bytes(4 * (end - size)))
+            self.total = sum(counts)
+        self.current_slot = slot
+
+    def add(self, slot, failures=1):
+        self.advance(slot)
+        if slot <= self.current_slot - len(self.counts): return # Arrived late and already outside the window
+        self.counts[slot % len(self.counts)] += failures
+        self.total += failures
+        self.last_failure_slot = max(self.last_failure_slot, slot) # Late events never move it backwards
+
+class BruteForceDetector:
+    """
+    Sliding-window failed-login counts per account and per source IP.
+
+    record() ingests one login event and returns the account's failures
+    inside the window; events without an account count only towards their IP
+    and return its failures. is_flagged() compares either count with
+    `threshold`, so checking a source IP catches password spraying across
+    accounts. Keys whose window has emptied are dropped every `sweep_every` events.
+    """
+    def __init__(self, window_seconds=300, resolution=1.0, threshold=DEFAULT_FAILURE_THRESHOLD, clock=time.monotonic,
+                 sweep_every=10_000):
+        self.resolution = resolution
+        self.slots = max(1, round(window_seconds / resolution))
+        self.threshold = threshold
+        self.clock = clock
+        self.sweep_every = sweep_every
+        self.by_account = {}
+        self.by_ip = {}
+        self._events_since_sweep = 0
+
+    def _slot(self, timestamp):
+        return int((self.clock() if timestamp is None else timestamp) // self.resolution)
+
+    def record(self, account, source_ip=None, success=False, timestamp=None):
+        slot = self._slot(timestamp)
+        self._events_since_sweep += 1
+        if self._events_since_sweep >= self.sweep_every: self.sweep(slot)
+        if account is None and (success or source_ip is None): return self.failures(source_ip=source_ip, timestamp=timestamp)
+        if success: return self.failures(account=account, timestamp=timestamp)
+        for windows, key in ((self.by_account, account), (self.by_ip, source_ip)):
+            if key is None: continue
+            window = windows.get(key)
+            if window is None: window = windows[key] = FailureWindow(self.slots, slot)
+            window.add(slot)
+        if account is None: return self.by_ip[source_ip].total
+        return self.by_account[account].total
+
+    def failures(self, account=None, source_ip=None, timestamp=None):
+        """Failures inside the window for one account or one source IP."""
+        windows, key = (self.by_account, account) if account is not None else (self.by_ip, source_ip)
+        window = windows.get(key)
+        if window is None: return 0
+        window.advance(self._slot(timestamp))
+        return window.total
+
+    def is_flagged(self, account=None, source_ip=None, timestamp=None):
+        """True once an account or source IP has more than `threshold` failures in the window."""
+        return self.failures(account=account, source_ip=source_ip, timestamp=timestamp) > self.threshold
+
+    def sweep(self, slot=None):
+        """Forget accounts and IPs with no failures left in the window."""
+        slot = self._slot(None) if slot is None else slot
+        horizon = slot - self.slots
+        for windows in (self.by_account, self.by_ip):
+            for key in [key for key, window in windows.items() if window.last_failure_slot <= horizon]:
+                del windows[key]
+        self._events_since_sweep = 0
+
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python brute_force_detector.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+def benchmark_detector(event_count=None, accounts=50_000, events_per_second=500):
+    """Event throughput and tracked-key count for a long synthetic login stream."""
+    event_count = event_count or int(1_000_000 * benchmark_scale())
+    rng = random.Random(6)
+    users = [f"user{i}" for i in range(accounts)]
+    events = [(rng.choice(users), f"198.51.{rng.randrange(256)}.{rng.randrange(256)}", rng.random() < 0.7,
+               index / events_per_second) for index in range(event_count)]
+    detector = BruteForceDetector(window_seconds=300)
+    started = time.perf_counter()
+    threshold = detector.threshold
+    alerts = 0
+    for account, source_ip, success, timestamp in events:
+        if detector.record(account, source_ip, success, timestamp) > threshold: alerts += 1
+    elapsed = time.perf_counter() - started
+    print(f"  {event_count:,} events over {event_count / events_per_second / 60:.0f} simulated minutes: "
+          f"{event_count / elapsed:,.0f} events/sec")
+    print(f"  tracked at the end: {len(detector.by_account):,} accounts, {len(detector.by_ip):,} IPs; "
+          f"{alerts:,} events over the threshold")
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: sliding-window brute-force detection")
+    print("="*50)
+    benchmark_detector()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_detector():
+    all_passed = True
+    try:
+        detector = BruteForceDetector(window_seconds=60, threshold=5)
+        counts = [detector.record("admin", "203.0.113.5", timestamp=second) for second in range(8)]
+        assert counts == [1, 2, 3, 4, 5, 6, 7, 8], counts
+        assert detector.record("admin", "203.0.113.5", success=True, timestamp=8) == 8, "success counted as failure"
+        assert detector.is_flagged(account="admin", timestamp=30) and detector.is_flagged(source_ip="203.0.113.5", timestamp=30)
+        assert detector.failures(account="admin", timestamp=62) == 5 and not detector.is_flagged(account="admin", timestamp=62)
+        assert detector.failures(account="admin", timestamp=68) == 0
+        print("✅ Detector Test 1 (failure counts over a sliding window): PASSED")
+    except AssertionError as e:
+        print(f"❌ Detector Test 1 (failure counts over a sliding window): FAILED - {e}")
+        all_passed = False
+
+    try:
+        detector = BruteForceDetector(window_seconds=10, resolution=0.5, sweep_every=5)
+        for index in range(12): detector.record(f"user{index}", "192.0.2.66", timestamp=index * 0.1)
+        assert detector.is_flagged(source_ip="192.0.2.66", timestamp=1.2), "spraying missed"
+        assert not any(detector.is_flagged(account=f"user{i}", timestamp=1.2) for i in range(12))
+        assert detector.failures(source_ip="192.0.2.66", timestamp=1000) == 0
+        detector.record("late", "192.0.2.1", timestamp=1000)
+        detector.sweep(detector._slot(1000))
+        assert set(detector.by_account) == {"late"} and set(detector.by_ip) == {"192.0.2.1"}, "idle keys not swept"
+        print("✅ Detector Test 2 (per-IP spraying and expiry): PASSED")
+    except AssertionError as e:
+        print(f"❌ Detector Test 2 (per-IP spraying and expiry): FAILED - {e}")
+        all_passed = False
+
+    try:
+        detector = BruteForceDetector(window_seconds=10)
+        for second in (100, 101, 102): detector.record("bob", "192.0.2.7", timestamp=second)
+        assert detector.record("bob", "192.0.2.7", timestamp=50) == 3, "expired late event counted"
+        assert detector.failures(account="bob", timestamp=102) == 3
+        assert detector.by_account["bob"].last_failure_slot == 102, "late event moved last_failure_slot back"
+        detector.record("bob", "192.0.2.7", timestamp=95) # Late but still inside the window
+        assert detector.failures(account="bob", timestamp=102) == 4 and detector.failures(account="bob", timestamp=106) == 3
+        assert detector.record(None, "192.0.2.7", timestamp=102) == 5
+        assert detector.record(None, timestamp=102) == 0 and None not in detector.by_account
+        print("✅ Detector Test 3 (late events and events without an account): PASSED")
+    except (AssertionError, KeyError) as e:
+        print(f"❌ Detector Test 3 (late events and events without an account): FAILED - {e!r}")
+        all_passed = False
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_detector()
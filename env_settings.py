@@ -0,0 +1,95 @@
+"""
+====================================================================
+ENVIRONMENT SETTINGS ⚙️ - Numeric tuning knobs read at call time
+====================================================================
+
+Shared helper for the Module 3-8 helper modules.
+
+The benchmark sizes (BENCHMARK_SCALE, LOG_BENCHMARK_MB) and the alert
+de-duplication timings (ALERT_DEDUP_WINDOW, ALERT_SUMMARY_INTERVAL) come
+from environment variables. They are read when they are used rather than at
+import time, so a test or a long-running tool can change them without
+re-importing anything, and a malformed or out-of-range value falls back to
+the default with a warning instead of breaking the import.
+
+Run `python env_settings.py` for the built-in checks.
+"""
+
+import math
+import os
+import warnings
+
+def env_number(name, default, kind=float, valid=None):
+    """
+    The environment variable `name` converted with `kind` (float or int), or
+    `default` when it is unset or empty. Values that do not convert, are not
+    finite or fail the `valid` check also give `default`, with a RuntimeWarning.
+    """
+    text = os.environ.get(name, "").strip()
+    if not text: return default
+    try:
+        value = kind(text)
+    except ValueError:
+        value = None
+    if value is None or not math.isfinite(value) or (valid is not None and not valid(value)):
+        warnings.warn(f"Ignoring {name}={text!r}; using {default}", RuntimeWarning, stacklevel=2)
+        return default
+    return value
+
+def _positive(value):
+    return value > 0
+
+def benchmark_scale():
+    """BENCHMARK_SCALE (default 1): multiplies the input sizes of every --benchmark run."""
+    return env_number("BENCHMARK_SCALE", 1.0, valid=_positive)
+
+def log_benchmark_mb():
+    """LOG_BENCHMARK_MB (default 256): size of the generated logs for the Module 8 benchmarks."""
+    return env_number("LOG_BENCHMARK_MB", 256, kind=int, valid=_positive)
+
+def alert_dedup_window(default=3600.0):
+    """ALERT_DEDUP_WINDOW: seconds an alert suppresses identical repeats (`default` when unset or invalid)."""
+    return env_number("ALERT_DEDUP_WINDOW", default, valid=_positive)
+
+def alert_summary_interval():
+    """ALERT_SUMMARY_INTERVAL (default 300): seconds between summaries of suppressed alerts."""
+    return env_number("ALERT_SUMMARY_INTERVAL", 300.0, valid=_positive)
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_env_settings():
+    saved = {name: os.environ.get(name) for name in ("BENCHMARK_SCALE", "LOG_BENCHMARK_MB", "ALERT_DEDUP_WINDOW")}
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            os.environ.pop("BENCHMARK_SCALE", None)
+            assert benchmark_scale() == 1.0 and not caught
+            os.environ["BENCHMARK_SCALE"] = " 0.25 "
+            assert benchmark_scale() == 0.25, "not read at call time"
+            for bad in ("abc", "0", "-1", "nan", "inf"):
+                os.environ["BENCHMARK_SCALE"] = bad
+                assert benchmark_scale() == 1.0, f"{bad!r} not rejected"
+            assert len(caught) == 5 and all(issubclass(w.category, RuntimeWarning) for w in caught)
+            os.environ["LOG_BENCHMARK_MB"] = "1.5"
+            assert log_benchmark_mb() == 256
+            os.environ["LOG_BENCHMARK_MB"] = "8"
+            assert log_benchmark_mb() == 8
+            os.environ.pop("ALERT_DEDUP_WINDOW", None)
+            assert alert_dedup_window() == 3600.0 and alert_dedup_window(None) is None
+            os.environ["ALERT_DEDUP_WINDOW"] = "600"
+            assert alert_dedup_window(None) == 600.0
+        print("✅ Env Settings Test (lazy reads with fallback): PASSED")
+        return True
+    except AssertionError as e:
+        print(f"❌ Env Settings Test (lazy reads with fallback): FAILED - {e}")
+        return False
+    finally:
+        for name, value in saved.items():
+            if value is None: os.environ.pop(name, None)
+            else: os.environ[name] = value
+
+if __name__ == "__main__":
+    test_env_settings()
@@ -0,0 +1,230 @@
+"""
+====================================================================
+IP ACCESS-CONTROL INDEX 🛡️ - Fast allow-list lookups
+====================================================================
+
+Shared helper for Module 6 (TASK 2: IP Access Control Validation).
+
+Checking `ip in ip_whitelist` scans the whole list for every connection
+attempt, and a plain list cannot express ranges like "10.0.0.0/8". This
+module keeps single addresses in a dict keyed by the packed 32-bit integer
+(O(1) lookups) and CIDR blocks in a binary radix trie searched by
+longest-prefix match (at most 32 steps), so a deny rule such as
+"10.0.5.0/24" can carve a hole in an allowed "10.0.0.0/8".
+
+Run `python ip_access_index.py` for the built-in checks and
+`python ip_access_index.py --benchmark` to compare against the list scan.
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+import warnings
+from array import array
+
+from env_settings import benchmark_scale
+from packed_ip import format_ipv4, parse_cidr, parse_ipv4
+
+_MISSING = object() # Trie node without a rule of its own
+
+class IPAccessIndex:
+    """
+    Allow/deny rules for IPv4 addresses and CIDR blocks.
+
+    add("192.168.1.1") / add("10.0.0.0/8") allow, add(..., allowed=False)
+    denies; the most specific matching rule wins. Addresses without any
+    matching rule are blocked. Entries passed to the constructor that are not
+    canonical addresses or CIDR blocks (e.g. "192.168.1.01") are skipped with
+    a RuntimeWarning and kept in `invalid_entries`; add() itself raises
+    ValueError for them. A CIDR block with host bits set ("10.1.2.3/8") is
+    added as its network (10.0.0.0/8), also with a warning.
+    """
+    def __init__(self, entries=()):
+        self._exact = {} # /32 rules: packed address -> allowed
+        # Trie nodes live in parallel arrays; node 0 is the root (the /0 rule)
+        # and a child index of 0 means "no child".
+        self._zero = array("I", [0])
+        self._one = array("I", [0])
+        self._rules = [_MISSING]
+        self._deepest_prefix = 0
+        self.invalid_entries = []
+        for entry in entries:
+            try:
+                self.add(entry)
+            except ValueError:
+                self.invalid_entries.append(entry)
+        if self.invalid_entries:
+            shown = ", ".join(map(repr, self.invalid_entries[:5])) + (", ..." if len(self.invalid_entries) > 5 else "")
+            warnings.warn(f"Skipped {len(self.invalid_entries)} entries that are not IPv4 addresses or CIDR "
+                          f"blocks: {shown}", RuntimeWarning, stacklevel=2)
+
+    def add(self, spec, allowed=True):
+        network, prefix_length = parse_cidr(spec)
+        if prefix_length < 32 and parse_ipv4(spec.partition("/")[0]) != network:
+            warnings.warn(f"{spec!r} has host bits set; adding {format_ipv4(network)}/{prefix_length}",
+                          RuntimeWarning, stacklevel=2)
+        if prefix_length == 32:
+            self._exact[network] = allowed
+            return
+        node = 0
+        for shift in range(31, 31 - prefix_length, -1):
+            branch = self._one if network >> shift & 1 else self._zero
+            child = branch[node]
+            if not child:
+                child = len(self._rules)
+                branch[node] = child
+                self._zero.append(0)
+                self._one.append(0)
+                self._rules.append(_MISSING)
+            node = child
+        self._rules[node] = allowed
+        self._deepest_prefix = max(self._deepest_prefix, prefix_length)
+
+    def lookup(self, ip, default=None):
+        """
+        Rule (True/False) of the most specific entry matching ip (a string or
+        packed int), or default. Raises ValueError for malformed addresses and
+        ints outside 0..0xFFFFFFFF.
+        """
+        if isinstance(ip, int) and not isinstance(ip, bool):
+            if not 0 <= ip <= 0xFFFFFFFF: raise ValueError(f"Invalid IPv4 address: {ip!r}")
+            address = ip
+        else:
+            address = parse_ipv4(ip)
+        rule = self._exact.get(address, _MISSING)
+        if rule is not _MISSING: return rule
+        zero, one, rules = self._zero, self._one, self._rules
+        node, best = 0, rules[0]
+        for shift in range(31, 31 - self._deepest_prefix, -1):
+            node = (one if address >> shift & 1 else zero)[node]
+            if not node: break
+            if rules[node] is not _MISSING: best = rules[node]
+        return default if best is _MISSING else best
+
+    def allows(self, ip):
+        """True only if the most specific rule for ip allows it; malformed input is blocked."""
+        try:
+            return self.lookup(ip) is True
+        except ValueError:
+            return False
+
+    __contains__ = allows
+
+    def validate(self, connection_attempts):
+        """Module 6 TASK 2 result shape: [{"ip": ..., "status": "allowed" | "blocked"}, ...]."""
+        allows = self.allows
+        return [{"ip": ip, "status": "allowed" if allows(ip) else "blocked"} for ip in connection_attempts]
+
+    def __len__(self):
+        return len(self._exact) + sum(rule is not _MISSING for rule in self._rules)
+
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python ip_access_index.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+def _benchmark_whitelist(entry_count, cidr_share=0.05, seed=1):
+    rng = random.Random(seed)
+    entries = [format_ipv4(rng.getrandbits(32)) for _ in range(int(entry_count * (1 - cidr_share)))]
+    for _ in range(entry_count - len(entries)):
+        prefix_length = rng.randint(16, 28)
+        network = rng.getrandbits(32) >> (32 - prefix_length) << (32 - prefix_length)
+        entries.append(f"{format_ipv4(network)}/{prefix_length}")
+    return entries
+
+def benchmark_access_index(entry_count=None, attempt_count=None):
+    """Lookup cost of the list scan used by TASK 2 vs the exact-set + radix-trie index."""
+    entry_count = entry_count or int(400_000 * benchmark_scale())
+    attempt_count = attempt_count or int(200_000 * benchmark_scale())
+    whitelist = _benchmark_whitelist(entry_count)
+    rng = random.Random(2)
+    exact_entries = [entry for entry in whitelist if "/" not in entry]
+    attempts = [rng.choice(exact_entries) if rng.random() < 0.5 else format_ipv4(rng.getrandbits(32))
+                for _ in range(attempt_count)]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = IPAccessIndex(whitelist)
+    build_seconds = time.perf_counter() - started
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"  {entry_count:,} rules ({entry_count - len(exact_entries):,} CIDR blocks): "
+          f"index built in {build_seconds:.2f}s, {index_bytes / 1e6:.1f} MB")
+
+    scan_sample = attempts[:max(1, int(500 * benchmark_scale()))] # The list scan is too slow for the full set
+    started = time.perf_counter()
+    for ip in scan_sample: ip in whitelist
+    scan_per_lookup = (time.perf_counter() - started) / len(scan_sample)
+
+    started = time.perf_counter()
+    results = index.validate(attempts)
+    index_per_lookup = (time.perf_counter() - started) / len(attempts)
+    allowed = sum(result["status"] == "allowed" for result in results)
+    print(f"  list scan      {scan_per_lookup * 1e6:12.1f} µs/lookup ({len(scan_sample):,} sampled lookups)")
+    print(f"  access index   {index_per_lookup * 1e6:12.2f} µs/lookup ({len(attempts):,} lookups, {allowed:,} allowed)")
+    print(f"  speed-up       {scan_per_lookup / index_per_lookup:12,.0f}x")
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: IP access-control index")
+    print("="*50)
+    benchmark_access_index()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_access_index():
+    all_passed = True
+    try:
+        index = IPAccessIndex(["192.168.1.1", "10.0.0.0/8", "172.16.0.0/12"])
+        index.add("10.0.5.0/24", allowed=False)
+        index.add("10.0.5.7")
+        assert index.allows("192.168.1.1") and not index.allows("192.168.1.2")
+        assert index.allows("10.200.1.1") and not index.allows("10.0.5.8") and index.allows("10.0.5.7")
+        assert index.allows("172.31.255.255") and not index.allows("172.32.0.0")
+        assert not index.allows("not-an-ip") and not index.allows("10.0.0") and not index.allows(None)
+        assert index.lookup(parse_ipv4("10.0.5.1")) is False and index.lookup("8.8.8.8") is None
+        assert len(index) == 5 and index.invalid_entries == []
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            lenient = IPAccessIndex(["192.168.1.01", "192.168.1.1", "10.0.0.0/33", None])
+            assert len(caught) == 1 and "192.168.1.01" in str(caught[0].message), "skipped entries not reported"
+            lenient.add("10.1.2.3/8")
+            assert len(caught) == 2 and "10.0.0.0/8" in str(caught[1].message), "host bits not reported"
+        assert lenient.invalid_entries == ["192.168.1.01", "10.0.0.0/33", None] and len(lenient) == 2
+        assert lenient.allows("192.168.1.1") and not lenient.allows("192.168.1.01") and lenient.allows("10.9.9.9")
+        everything = IPAccessIndex(["0.0.0.0/0"])
+        for bad in (1 << 32, (1 << 32) + parse_ipv4("10.0.0.1"), -1, True):
+            assert not everything.allows(bad), f"{bad!r} allowed"
+        assert everything.allows(0xFFFFFFFF) and everything.allows(0)
+        print("✅ Access Index Test 1 (exact + longest-prefix rules): PASSED")
+    except AssertionError as e:
+        print(f"❌ Access Index Test 1 (exact + longest-prefix rules): FAILED - {e}")
+        all_passed = False
+
+    try:
+        whitelist = _benchmark_whitelist(2000, cidr_share=0)
+        attempts = whitelist[::3] + [format_ipv4(value) for value in range(0x01010101, 0x01010101 + 500)]
+        expected = [{"ip": ip, "status": "allowed" if ip in whitelist else "blocked"} for ip in attempts]
+        assert IPAccessIndex(whitelist).validate(attempts) == expected, "index disagrees with the list scan"
+        assert format_ipv4(parse_ipv4("203.0.113.42")) == "203.0.113.42"
+        assert parse_cidr("10.1.2.3/8") == (parse_ipv4("10.0.0.0"), 8)
+        for bad in ("1.2.3.4/33", "1.2.3.4/x", "256.1.1.1"):
+            try:
+                parse_cidr(bad)
+                raise AssertionError(f"{bad!r} should be rejected")
+            except ValueError:
+                pass
+        print("✅ Access Index Test 2 (matches list-scan results): PASSED")
+    except AssertionError as e:
+        print(f"❌ Access Index Test 2 (matches list-scan results): FAILED - {e}")
+        all_passed = False
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_access_index()
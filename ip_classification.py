@@ -0,0 +1,199 @@
+"""
+====================================================================
+IP CLASSIFICATION 🧭 - Memoized and vectorized IPv4 categories
+====================================================================
+
+Shared helper for Module 7 (IP address validation in the cybersecurity
+examples).
+
+A log pipeline sees the same few source IPs over and over. check_ip_address()
+explains what is wrong with a bad address; validate_ip_address() puts a
+bounded LRU cache in front of it, and classify_ips() categorizes whole
+batches at once, vectorized with NumPy when it is installed.
+
+Run `python ip_classification.py` for the built-in checks and
+`python ip_classification.py --benchmark` for IPs/sec numbers.
+"""
+
+import functools
+import os
+import random
+import sys
+import time
+
+from env_settings import benchmark_scale
+from packed_ip import PackedIPv4, format_ipv4, ipv4_category, parse_ipv4
+
+try:
+    import numpy as np # Optional: vectorized classify_ips()
+except ImportError:
+    np = None
+
+def check_ip_address(ip):
+    """Return {"valid", "reason", "category"} for an IPv4 address string or packed int."""
+    # Canonical dotted quads and packed addresses (PackedIPv4 or a plain int in
+    # 0..0xFFFFFFFF, but not a bool) are classified straight from the packed
+    # int; other strings take the detailed path below, which also explains what
+    # is wrong with them.
+    if isinstance(ip, int) and not isinstance(ip, bool):
+        if 0 <= ip <= 0xFFFFFFFF: return {"valid": True, "reason": "Valid IP address", "category": ipv4_category(ip)}
+        return {"valid": False, "reason": "Address out of range", "category": "invalid"}
+    if not isinstance(ip, str): return {"valid": False, "reason": "Invalid format", "category": "invalid"}
+    try:
+        return {"valid": True, "reason": "Valid IP address", "category": ipv4_category(parse_ipv4(ip))}
+    except ValueError:
+        pass
+    parts = ip.split('.')
+    if len(parts) != 4: return {"valid": False, "reason": "Invalid format", "category": "invalid"}
+    try: octets = [int(part) for part in parts]
+    except ValueError: return {"valid": False, "reason": "Non-numeric octets", "category": "invalid"}
+    if not all(0 <= octet <= 255 for octet in octets): return {"valid": False, "reason": "Octet out of range", "category": "invalid"}
+    first_octet = octets[0]
+    if first_octet == 10 or (first_octet == 172 and 16 <= octets[1] <= 31) or (first_octet == 192 and octets[1] == 168): category = "private"
+    elif first_octet == 127: category = "loopback"
+    elif 224 <= first_octet <= 239: category = "multicast"
+    else: category = "public"
+    return {"valid": True, "reason": "Valid IP address", "category": category}
+
+IP_VALIDATION_CACHE_SIZE = int(os.environ.get("IP_VALIDATION_CACHE_SIZE", "65536"))
+IP_CATEGORIES = ("private", "loopback", "multicast", "public", "invalid")
+
+@functools.lru_cache(maxsize=IP_VALIDATION_CACHE_SIZE, typed=True) # typed: 1 and True get separate verdicts
+def _ip_verdict(ip):
+    result = check_ip_address(ip)
+    return result["valid"], result["reason"], result["category"]
+
+def validate_ip_address(ip):
+    """check_ip_address() with an LRU cache in front; returns a fresh dict each call."""
+    try:
+        valid, reason, category = _ip_verdict(ip)
+    except TypeError: # Unhashable input (e.g. a list) cannot be cached
+        return check_ip_address(ip)
+    return {"valid": valid, "reason": reason, "category": category}
+
+def ip_validation_cache_stats():
+    info = _ip_verdict.cache_info()
+    lookups = info.hits + info.misses
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize,
+            "hit_rate": info.hits / lookups if lookups else 0.0}
+
+def clear_ip_validation_cache():
+    _ip_verdict.cache_clear()
+
+def _classify_ips_numpy(ips):
+    # Canonical-looking rows ("d.d.d.d", 1-3 digits per field) are parsed
+    # column by column across the whole batch; anything else is left as None
+    # for the exact per-IP path.
+    try:
+        raw = np.array(ips, dtype="S16")
+    except (UnicodeEncodeError, TypeError, ValueError):
+        return [None] * len(ips)
+    chars = raw.view(np.uint8).reshape(len(ips), 16)
+    is_digit = (chars >= 48) & (chars <= 57)
+    is_dot = chars == 46
+    is_pad = chars == 0
+    field = np.cumsum(is_dot, axis=1)
+    octets = np.zeros((len(ips), 4), dtype=np.int32)
+    digit_counts = np.zeros((len(ips), 4), dtype=np.int32)
+    strict = (is_digit | is_dot | is_pad).all(axis=1) & ~is_pad[:, 0] & is_pad[:, 15]
+    strict &= (np.diff(is_pad.view(np.int8), axis=1) >= 0).all(axis=1) # Padding only at the end
+    strict &= field[:, 15] == 3
+    for column in range(15):
+        rows = np.flatnonzero(is_digit[:, column] & strict)
+        fields = field[rows, column]
+        octets[rows, fields] = octets[rows, fields] * 10 + (chars[rows, column] - 48)
+        digit_counts[rows, fields] += 1
+    strict &= ((digit_counts >= 1) & (digit_counts <= 3)).all(axis=1) & (octets <= 255).all(axis=1)
+    first, second = octets[:, 0], octets[:, 1]
+    private = (first == 10) | ((first == 172) & (second >= 16) & (second <= 31)) | ((first == 192) & (second == 168))
+    codes = np.select([private, first == 127, (first >= 224) & (first <= 239)], [0, 1, 2], default=3)
+    codes[~strict] = -1
+    return [IP_CATEGORIES[code] if code >= 0 else None for code in codes.tolist()]
+
+def classify_ips(ips, use_numpy=None):
+    """
+    Category (as in validate_ip_address()["category"]) for every IP in an
+    iterable, in order. With NumPy installed (or use_numpy=True) whole batches
+    are parsed vectorized; inputs the vectorized parser cannot vouch for go
+    through the cached per-IP path, so results always match validate_ip_address().
+    """
+    ips = ips if isinstance(ips, list) else list(ips)
+    if use_numpy is None: use_numpy = np is not None and len(ips) >= 1000
+    verdict = _ip_verdict
+    if not use_numpy: return [verdict(ip)[2] for ip in ips]
+    categories = _classify_ips_numpy(ips)
+    return [category if category is not None else verdict(ip)[2] for ip, category in zip(ips, categories)]
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python ip_classification.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+def benchmark_ip_classification(lookup_count=None, distinct_ips=2000):
+    """check_ip_address vs the memoized validate_ip_address (cold and warm) and classify_ips."""
+    lookup_count = lookup_count or int(500_000 * benchmark_scale())
+    rng = random.Random(11)
+    sources = [format_ipv4(rng.getrandbits(32)) for _ in range(distinct_ips)]
+    stream = [rng.choice(sources) for _ in range(lookup_count)]
+    unique_stream = [format_ipv4(rng.getrandbits(32)) for _ in range(lookup_count)]
+    runs = [("uncached", lambda: [check_ip_address(ip) for ip in stream]),
+            ("memoized, cold cache", lambda: [validate_ip_address(ip) for ip in stream]),
+            ("memoized, warm cache", lambda: [validate_ip_address(ip) for ip in stream]),
+            ("memoized, all-unique IPs", lambda: [validate_ip_address(ip) for ip in unique_stream]),
+            ("classify_ips (Python)", lambda: classify_ips(unique_stream, use_numpy=False))]
+    if np is not None: runs.append(("classify_ips (NumPy)", lambda: classify_ips(unique_stream, use_numpy=True)))
+    clear_ip_validation_cache()
+    for label, run in runs:
+        if label == "classify_ips (Python)": clear_ip_validation_cache()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        print(f"  {label:<26} {lookup_count / elapsed:12,.0f} IPs/sec")
+        if label.startswith("memoized, warm"):
+            stats = ip_validation_cache_stats()
+            print(f"  {'':<26} cache: {stats['hits']:,} hits / {stats['misses']:,} misses ({stats['hit_rate']:.1%})")
+    if np is None: print("  (NumPy not installed: vectorized classify_ips skipped)")
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: IP classification cache")
+    print("="*50)
+    benchmark_ip_classification()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_ip_classification():
+    all_passed = True
+    try:
+        clear_ip_validation_cache()
+        samples = ["192.168.1.1", "10.0.0.256", "invalid.ip", "203.0.113.42", "01.2.3.4", " 8.8.8.8", "1.2.3",
+                   "224.0.0.5", "127.0.0.1", "172.16.9.9", "172.32.0.1", "1.2.3.4.5", "1..2.3", "999.1.1.1", "", "255.255.255.255"]
+        for ip in samples: assert validate_ip_address(ip) == check_ip_address(ip), ip
+        for ip in samples: validate_ip_address(ip)
+        stats = ip_validation_cache_stats()
+        assert stats["hits"] == len(samples) and stats["misses"] == len(samples), stats
+        packed = [PackedIPv4("10.1.2.3"), 0xCB00712A, 0, 0xFFFFFFFF]
+        assert [check_ip_address(ip)["category"] for ip in packed] == ["private", "public", "public", "public"]
+        for bad in (2**40, -5, True, None, 1.5):
+            assert not check_ip_address(bad)["valid"], f"{bad!r} accepted"
+        assert validate_ip_address(1)["valid"] and not validate_ip_address(True)["valid"], "bool shares the cache entry of 1"
+        assert validate_ip_address(["10.0.0.1"]) == check_ip_address(["10.0.0.1"]), "unhashable input not handled"
+        clear_ip_validation_cache()
+        for ip in samples: validate_ip_address(ip)
+        validate_ip_address("192.168.1.1")["category"] = "tampered"
+        assert validate_ip_address("192.168.1.1")["category"] == "private", "cached verdicts must not be shared"
+        expected = [check_ip_address(ip)["category"] for ip in samples]
+        assert classify_ips(samples, use_numpy=False) == expected
+        if np is not None: assert classify_ips(samples * 100, use_numpy=True) == expected * 100, "NumPy path disagrees"
+        print("✅ IP Classification Test 1 (memoized IP classification): PASSED")
+    except (AssertionError, TypeError) as e:
+        print(f"❌ IP Classification Test 1 (memoized IP classification): FAILED - {e}")
+        all_passed = False
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_ip_classification()
@@ -0,0 +1,731 @@
+"""
+====================================================================
+LOG SCANNER 🔍 - Streaming, parallel and incremental log analysis
+====================================================================
+
+Shared helper for Module 8 (the analyze_security_log() helper).
+
+Reading a log with one regex and several lower() calls per line is slow,
+and collecting every critical line and suspicious IP in memory does not
+scale to multi-GB files. SecurityLogScanner scans each line once and can
+bound its collectors (sampled critical events, a HyperLogLog IP count);
+files can be scanned in memory-mapped chunks by a process pool, followed
+incrementally through a JSON checkpoint, or read straight from gzip, bz2 or
+xz archives.
+
+Run `python log_scanner.py` for the built-in checks and
+`python log_scanner.py --benchmark` for MB/s and memory numbers (set
+LOG_BENCHMARK_MB for the log size, default 256).
+"""
+
+import bz2
+import gzip
+import hashlib
+import json
+import lzma
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from env_settings import log_benchmark_mb
+from packed_ip import format_ipv4, parse_ipv4
+from stream_sampling import StreamSample
+from worker_pools import imap_in_processes
+
+# Rotated logs are often gzip, bz2 or xz archives. open_log_file() recognises
+# them by their first bytes (not the file extension) and decompresses while
+# reading, so nothing has to be unpacked to disk first.
+COMPRESSION_OPENERS = {b"\x1f\x8b": gzip.open, b"BZh": bz2.open, b"\xfd7zXZ\x00": lzma.open}
+COMPRESSED_LOG_EXTENSIONS = (".gz", ".bz2", ".xz")
+
+def detect_compression(filename):
+    """Return the stdlib opener for a compressed file, or None for plain files."""
+    with open(filename, "rb") as f: magic = f.read(6)
+    for signature, opener in COMPRESSION_OPENERS.items():
+        if magic.startswith(signature): return opener
+    return None
+
+def open_log_file(filename, mode="r"):
+    """Open a plain or compressed log for reading ("r" for text, "rb" for bytes)."""
+    opener = detect_compression(filename)
+    if opener is None: return open(filename, mode)
+    return opener(filename, "rt" if mode == "r" else mode)
+
+# analyze_security_log() is built on this engine. Each line is scanned once:
+# severity is picked with a single ordered check, the line is lowercased at most
+# once, and the IPv4 pattern (compiled once) only runs on lines that mention
+# "failed" or "suspicious" - the only lines whose IPs are ever kept.
+LOG_SEVERITY_LEVELS = ("INFO", "WARNING", "ERROR", "CRITICAL")
+IPV4_PATTERN = re.compile(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b')
+
+# Bounded collectors keep memory flat on huge logs. With the defaults they keep
+# everything, exactly like the original critical_events list / suspicious_ips set.
+# The critical_events sample is a StreamSample (see stream_sampling.py).
+
+class DistinctIPCounter:
+    """
+    Counts distinct IPs. "exact" mode keeps a set of packed 32-bit ints (plus,
+    for the rare regex match that is not a canonical address such as
+    "999.1.1.1", the string itself); "hll" mode keeps a HyperLogLog sketch of
+    2**precision one-byte registers (16 KB by default, ~0.8% typical error)
+    plus up to `sample_limit` example addresses.
+    """
+
+    def __init__(self, mode="exact", precision=14, sample_limit=100):
+        if mode not in ("exact", "hll"): raise ValueError(f"Unknown counting mode: {mode}")
+        self.mode = mode
+        self.precision = precision
+        self.sample_limit = sample_limit
+        self.ips = set()
+        self.registers = bytearray(1 << precision) if mode == "hll" else None
+
+    def update(self, ips):
+        if self.mode == "exact":
+            add = self.ips.add
+            for ip in ips:
+                try:
+                    add(parse_ipv4(ip))
+                except ValueError:
+                    add(ip)
+            return
+        registers, precision = self.registers, self.precision
+        low_bits = 64 - precision
+        for ip in ips:
+            hashed = int.from_bytes(hashlib.blake2b(ip.encode(), digest_size=8).digest(), "big")
+            index = hashed >> low_bits
+            remainder = hashed & ((1 << low_bits) - 1)
+            rank = low_bits - remainder.bit_length() + 1
+            if rank > registers[index]: registers[index] = rank
+            if len(self.ips) < self.sample_limit: self.ips.add(ip)
+
+    def merge(self, other):
+        if self.mode == "exact":
+            self.ips.update(other.ips)
+            return
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        for ip in other.ips:
+            if len(self.ips) >= self.sample_limit: break
+            self.ips.add(ip)
+
+    def count(self):
+        if self.mode == "exact": return len(self.ips)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zero_registers = self.registers.count(0)
+        if estimate <= 2.5 * m and zero_registers:
+            estimate = m * math.log(m / zero_registers) # Linear counting for small sets
+        return round(estimate)
+
+    def values(self):
+        if self.mode == "hll": return list(self.ips)
+        return [format_ipv4(ip) if type(ip) is int else ip for ip in self.ips]
+
+    def to_checkpoint(self):
+        return {"mode": self.mode, "precision": self.precision, "sample_limit": self.sample_limit,
+                "ips": self.values(), "registers": self.registers.hex() if self.registers else None}
+
+    @classmethod
+    def from_checkpoint(cls, state):
+        counter = cls(state["mode"], state["precision"], state["sample_limit"])
+        if counter.mode == "exact": counter.update(state["ips"])
+        else: counter.ips.update(state["ips"])
+        if state["registers"]: counter.registers = bytearray.fromhex(state["registers"])
+        return counter
+
+class SecurityLogScanner:
+    """
+    Accumulates analyze_security_log() statistics one line at a time.
+    `critical_limit`/`critical_sampling` bound the critical_events sample and
+    `ip_counting="hll"` switches suspicious IPs to an approximate distinct count.
+    """
+
+    def __init__(self, critical_limit=None, critical_sampling="first", ip_counting="exact"):
+        self.options = {"critical_limit": critical_limit, "critical_sampling": critical_sampling,
+                        "ip_counting": ip_counting}
+        self.total_entries = 0
+        self.by_severity = dict.fromkeys(LOG_SEVERITY_LEVELS, 0)
+        self.failed_logins = 0
+        self.suspicious_ips = DistinctIPCounter(ip_counting)
+        self.critical_events = StreamSample(critical_limit, critical_sampling)
+        self.bytes_read = 0
+
+    def feed(self, lines):
+        """Scan an iterable of raw log lines (trailing newlines are fine); see feed_bytes() for file data."""
+        by_severity = self.by_severity
+        find_ips = IPV4_PATTERN.findall
+        add_ips = self.suspicious_ips.update
+        add_critical = self.critical_events.add
+        total = failed_logins = 0
+        for raw_line in lines:
+            line = raw_line.strip()
+            if not line: continue
+            total += 1
+            # Same precedence as the original by_severity loop: first listed level wins
+            if "INFO" in line: by_severity["INFO"] += 1
+            elif "WARNING" in line: by_severity["WARNING"] += 1
+            elif "ERROR" in line: by_severity["ERROR"] += 1
+            elif "CRITICAL" in line: by_severity["CRITICAL"] += 1
+            lowered = line.lower()
+            if "failed" in lowered:
+                if "failed login" in lowered: failed_logins += 1
+                add_ips(find_ips(line))
+            elif "suspicious" in lowered:
+                add_ips(find_ips(line))
+            if "CRITICAL" in line: add_critical(line)
+        self.total_entries += total
+        self.failed_logins += failed_logins
+
+    def feed_bytes(self, data):
+        """
+        Scan a block of whole lines read from a log and count its bytes. Every
+        read path (plain, compressed, parallel chunks, checkpoints) comes through
+        here, so lines always end at "\\n", "\\r\\n" or "\\r" (str.splitlines()).
+        """
+        self.feed(data.decode("utf-8", errors="replace").splitlines())
+        self.bytes_read += len(data)
+
+    def merge(self, other):
+        """Fold the results of another scanner (e.g. a later file chunk) into this one."""
+        self.total_entries += other.total_entries
+        for sev, count in other.by_severity.items(): self.by_severity[sev] += count
+        self.failed_logins += other.failed_logins
+        self.suspicious_ips.merge(other.suspicious_ips)
+        self.critical_events.merge(other.critical_events)
+        self.bytes_read += other.bytes_read
+
+    def to_checkpoint(self):
+        """JSON-serialisable snapshot of the running state (see from_checkpoint)."""
+        return {
+            "options": self.options,
+            "total_entries": self.total_entries,
+            "by_severity": self.by_severity,
+            "failed_logins": self.failed_logins,
+            "bytes_read": self.bytes_read,
+            "suspicious_ips": self.suspicious_ips.to_checkpoint(),
+            "critical_events": self.critical_events.to_checkpoint(),
+        }
+
+    @classmethod
+    def from_checkpoint(cls, state):
+        scanner = cls(**state["options"])
+        scanner.total_entries = state["total_entries"]
+        scanner.by_severity.update(state["by_severity"])
+        scanner.failed_logins = state["failed_logins"]
+        scanner.bytes_read = state["bytes_read"]
+        scanner.suspicious_ips = DistinctIPCounter.from_checkpoint(state["suspicious_ips"])
+        scanner.critical_events = StreamSample.from_checkpoint(state["critical_events"])
+        return scanner
+
+    def progress(self):
+        """Cheap running totals, suitable for frequent progress reports."""
+        return {
+            "total_entries": self.total_entries,
+            "by_severity": dict(self.by_severity),
+            "failed_logins": self.failed_logins,
+            "suspicious_ip_count": self.suspicious_ips.count(),
+            "critical_event_count": self.critical_events.seen,
+            "bytes_read": self.bytes_read,
+        }
+
+    def stats(self):
+        """Full result in the analyze_security_log() format."""
+        return {
+            "total_entries": self.total_entries,
+            "by_severity": dict(self.by_severity),
+            "failed_logins": self.failed_logins,
+            "suspicious_ips": self.suspicious_ips.values(),
+            "critical_events": self.critical_events.values(),
+            "suspicious_ip_count": self.suspicious_ips.count(),
+            "critical_event_count": self.critical_events.seen,
+        }
+
+def iter_security_log_stats(log_filename, scanner=None, report_every=100_000, batch_bytes=1 << 20):
+    """
+    Stream a log file through a SecurityLogScanner, yielding progress() dicts.
+    A report is yielded roughly every `report_every` entries (0 disables the
+    intermediate reports) and once more at the end. Pass your own `scanner` to
+    read the full stats() afterwards.
+    """
+    if scanner is None: scanner = SecurityLogScanner()
+    next_report = scanner.total_entries + report_every
+    with open_log_file(log_filename, "rb") as log_file:
+        for block in _iter_line_blocks(log_file, batch_bytes):
+            scanner.feed_bytes(block)
+            if report_every and scanner.total_entries >= next_report:
+                next_report = scanner.total_entries + report_every
+                yield scanner.progress()
+    yield scanner.progress()
+
+def _last_line_break(data):
+    # Offset just past the last "\n" or "\r" in data (0 if there is none). A
+    # "\r\n" cut between its two bytes only adds an empty line, which is skipped.
+    return max(data.rfind(b"\n"), data.rfind(b"\r")) + 1
+
+def _iter_line_blocks(log_file, batch_bytes):
+    # Yield ~batch_bytes blocks of whole lines from a binary file; the last one
+    # may lack its line break. Decoding (with undecodable bytes replaced, so a
+    # stray byte never hides the file) is left to feed_bytes().
+    pending = b""
+    while True:
+        block = log_file.read(batch_bytes)
+        if not block: break
+        data = pending + block
+        cut = _last_line_break(data)
+        if cut: yield data[:cut]
+        pending = data[cut:]
+    if pending: yield pending
+
+# Parallel mode: the file is memory-mapped, cut into chunks that end on a
+# newline, and each chunk is scanned by a worker process. Partial scanners come
+# back in file order, so merging them gives exactly the single-process result.
+PARALLEL_MIN_CHUNK_BYTES = 8 * 1024 * 1024
+
+def split_log_chunks(log_filename, chunk_count, min_chunk_bytes=PARALLEL_MIN_CHUNK_BYTES):
+    """Return (start, end) byte ranges covering the file, each ending after a newline."""
+    file_size = os.path.getsize(log_filename)
+    if file_size == 0: return []
+    target = max(min_chunk_bytes, -(-file_size // max(chunk_count, 1)))
+    chunks = []
+    with open(log_filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < file_size:
+            newline = mm.find(b"\n", min(start + target, file_size) - 1)
+            end = file_size if newline == -1 else newline + 1
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+def _scan_log_chunk(task):
+    # Worker entry point: scan bytes [start, end) of the file in ~1 MB slices
+    log_filename, start, end, batch_bytes, scanner_options = task
+    scanner = SecurityLogScanner(**scanner_options)
+    with open(log_filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < end:
+            newline = mm.find(b"\n", min(pos + batch_bytes, end) - 1, end)
+            stop = end if newline == -1 else newline + 1
+            scanner.feed_bytes(mm[pos:stop])
+            pos = stop
+    return scanner
+
+def scan_security_log_parallel(log_filename, scanner=None, workers=None, batch_bytes=1 << 20,
+                               min_chunk_bytes=PARALLEL_MIN_CHUNK_BYTES):
+    """Scan a log with a pool of forked workers (see worker_pools.py) and merge the chunk results into `scanner`."""
+    if scanner is None: scanner = SecurityLogScanner()
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps every core busy when some chunks are slower
+    chunks = split_log_chunks(log_filename, workers * 4, min_chunk_bytes)
+    tasks = [(log_filename, start, end, batch_bytes, scanner.options) for start, end in chunks]
+    for partial in imap_in_processes(_scan_log_chunk, tasks, min(workers, len(tasks))):
+        scanner.merge(partial)
+    return scanner
+
+# Incremental mode: a JSON checkpoint remembers the file's inode, the byte offset
+# just past the last complete line, and the scanner state. Each update only reads
+# what was appended since, and the state stays small: the counts plus at most
+# CHECKPOINT_CRITICAL_LIMIT critical lines (unless a smaller critical_limit is
+# given), so saving it does not grow with the log. A smaller file means it was truncated (start again at
+# 0); a new inode means it was rotated, in which case the rest of the old file is
+# read from "<log>.1" when it is still there. Stats keep accumulating throughout.
+def _scan_log_from_offset(scanner, log_file, offset, batch_bytes, final=False):
+    # Feed complete lines from `offset` onwards; returns the offset after the last one
+    log_file.seek(offset)
+    pending = b""
+    while True:
+        block = log_file.read(batch_bytes)
+        if not block: break
+        data = pending + block
+        cut = _last_line_break(data)
+        if cut:
+            scanner.feed_bytes(data[:cut])
+            offset += cut
+        pending = data[cut:]
+    if final and pending:
+        scanner.feed_bytes(pending)
+        offset += len(pending)
+    return offset
+
+CHECKPOINT_CRITICAL_LIMIT = 1000
+
+def _checkpoint_scanner_options(scanner_options, saved_options=None):
+    # The options a checkpointed scan runs with: anything not passed comes from
+    # the checkpoint, and an unbounded critical_limit is capped. Passing an option
+    # that differs from the checkpoint's is an error rather than silently ignored.
+    options = dict(saved_options or SecurityLogScanner().options)
+    options.update(scanner_options)
+    if options["critical_limit"] is None or options["critical_limit"] > CHECKPOINT_CRITICAL_LIMIT:
+        options["critical_limit"] = CHECKPOINT_CRITICAL_LIMIT
+    if saved_options is not None and options != saved_options:
+        conflicts = ", ".join(f"{name}={options[name]!r} (checkpoint has {saved_options[name]!r})"
+                              for name in options if options[name] != saved_options.get(name))
+        raise ValueError(f"Checkpoint options differ from the requested ones: {conflicts}; "
+                         f"use a new checkpoint file to change them")
+    return options
+
+def load_log_checkpoint(checkpoint_filename):
+    """Return the saved checkpoint dict, or None if there is no usable checkpoint."""
+    try:
+        with open(checkpoint_filename, "r") as f: return json.load(f)
+    except (OSError, ValueError): return None
+
+def save_log_checkpoint(checkpoint_filename, state):
+    """Write the checkpoint atomically so a crash never leaves a half-written file."""
+    temp_filename = f"{checkpoint_filename}.tmp"
+    with open(temp_filename, "w") as f: json.dump(state, f)
+    os.replace(temp_filename, checkpoint_filename)
+
+def update_security_log_checkpoint(log_filename, checkpoint_filename, batch_bytes=1 << 20, **scanner_options):
+    """
+    Scan only the lines appended since the last call and return the cumulative
+    stats. critical_events holds at most CHECKPOINT_CRITICAL_LIMIT lines
+    (critical_event_count still counts them all). Options that are passed must
+    match the ones the checkpoint was made with (ValueError otherwise).
+    """
+    state = load_log_checkpoint(checkpoint_filename)
+    if state and state.get("log_filename") == log_filename:
+        _checkpoint_scanner_options(scanner_options, state["scanner"]["options"])
+        scanner = SecurityLogScanner.from_checkpoint(state["scanner"])
+        inode, offset = state["inode"], state["offset"]
+    else:
+        scanner = SecurityLogScanner(**_checkpoint_scanner_options(scanner_options))
+        inode, offset = None, 0
+    if not os.path.exists(log_filename): return scanner.stats()
+    with open(log_filename, "rb") as log_file:
+        current = os.fstat(log_file.fileno())
+        if inode is not None and current.st_ino != inode:
+            rotated_filename = f"{log_filename}.1"
+            if os.path.exists(rotated_filename) and os.stat(rotated_filename).st_ino == inode:
+                with open(rotated_filename, "rb") as rotated_file:
+                    _scan_log_from_offset(scanner, rotated_file, offset, batch_bytes, final=True)
+            offset = 0
+        elif current.st_size < offset:
+            offset = 0
+        offset = _scan_log_from_offset(scanner, log_file, offset, batch_bytes)
+    save_log_checkpoint(checkpoint_filename, {"log_filename": log_filename, "inode": current.st_ino,
+                                              "offset": offset, "scanner": scanner.to_checkpoint()})
+    return scanner.stats()
+
+def follow_security_log(log_filename, checkpoint_filename, interval=60.0, max_updates=None, **scanner_options):
+    """Tail-follow a log: yield cumulative stats every `interval` seconds."""
+    updates = 0
+    while max_updates is None or updates < max_updates:
+        yield update_security_log_checkpoint(log_filename, checkpoint_filename, **scanner_options)
+        updates += 1
+        if max_updates is None or updates < max_updates: time.sleep(interval)
+
+
+def analyze_security_log(log_filename, workers=1, critical_limit=None, critical_sampling="first",
+                         ip_counting="exact", checkpoint_filename=None):
+    # workers > 1 (or None for one per CPU) scans the file in parallel chunks;
+    # critical_limit / ip_counting="hll" bound memory (see SecurityLogScanner);
+    # checkpoint_filename resumes from the previous call (see update_security_log_checkpoint;
+    # critical_events is then capped at CHECKPOINT_CRITICAL_LIMIT lines)
+    scanner = SecurityLogScanner(critical_limit, critical_sampling, ip_counting)
+    if not os.path.exists(log_filename): return scanner.stats()
+    try:
+        # Compressed logs can't be seeked into, so they are always streamed in full
+        compressed = detect_compression(log_filename) is not None
+        if checkpoint_filename and not compressed:
+            return update_security_log_checkpoint(log_filename, checkpoint_filename, **scanner.options)
+        if workers == 1 or compressed:
+            for _ in iter_security_log_stats(log_filename, scanner=scanner, report_every=0): pass
+        else:
+            scan_security_log_parallel(log_filename, scanner=scanner, workers=workers)
+    except ValueError: raise # Options that conflict with the checkpoint, not an unreadable log
+    except Exception: pass
+    return scanner.stats()
+
+def _analyze_security_log_reference(log_filename):
+    # The original line-by-line implementation, kept as the benchmark baseline
+    stats = {
+        "total_entries": 0,
+        "by_severity": {"INFO": 0, "WARNING": 0, "ERROR": 0, "CRITICAL": 0},
+        "failed_logins": 0, "suspicious_ips": set(), "critical_events": []
+    }
+    if not os.path.exists(log_filename): return stats
+    try:
+        with open(log_filename, "r") as log_file:
+            for line in log_file:
+                line = line.strip()
+                if not line: continue
+                stats["total_entries"] += 1
+                for sev in stats["by_severity"].keys():
+                    if sev in line: stats["by_severity"][sev] += 1; break
+                if "failed login" in line.lower(): stats["failed_logins"] += 1
+                ips = re.findall(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b', line)
+                if ips and ("failed" in line.lower() or "suspicious" in line.lower()):
+                    stats["suspicious_ips"].update(ips)
+                if "CRITICAL" in line: stats["critical_events"].append(line)
+    except Exception: pass
+    stats["suspicious_ips"] = list(stats["suspicious_ips"])
+    return stats
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python log_scanner.py --benchmark)
+# ============================================================================
+# Log size defaults to 256 MB; set LOG_BENCHMARK_MB (e.g. 4096) for a multi-GB run.
+BENCHMARK_LOG_MESSAGES = [
+    "INFO User login successful for alice from 10.0.{}.{}",
+    "WARNING Failed login for admin from 203.0.{}.{}",
+    "ERROR Disk quota exceeded on db-{}{}",
+    "CRITICAL Suspicious outbound connection to 198.51.{}.{}",
+    "INFO Session closed for user{}{}",
+    "WARNING High CPU usage on web-{}{}",
+]
+
+def generate_benchmark_log(log_filename, size_mb):
+    """Write a synthetic security log of roughly `size_mb` megabytes."""
+    block_lines = []
+    for i in range(20000):
+        message = BENCHMARK_LOG_MESSAGES[i % len(BENCHMARK_LOG_MESSAGES)]
+        block_lines.append(f"2023-10-01 14:{i // 60 % 60:02d}:{i % 60:02d} {message.format(i % 7, i % 251)}\n")
+    block = "".join(block_lines)
+    target_bytes = size_mb * 1024 * 1024
+    with open(log_filename, "w") as f:
+        written = 0
+        while written < target_bytes:
+            f.write(block)
+            written += len(block)
+    return os.path.getsize(log_filename)
+
+def benchmark_log_scanner(size_mb=None, log_filename="benchmark_security.log"):
+    """Compare analyze_security_log() throughput (MB/s) with the original implementation."""
+    size_mb = size_mb or log_benchmark_mb()
+    file_bytes = generate_benchmark_log(log_filename, size_mb)
+    try:
+        timings = {}
+        results = {}
+        for label, analyzer in (("original", _analyze_security_log_reference), ("streaming", analyze_security_log)):
+            started = time.perf_counter()
+            results[label] = analyzer(log_filename)
+            timings[label] = time.perf_counter() - started
+            print(f"  {label:<10} {timings[label]:8.2f}s  {file_bytes / 1e6 / timings[label]:8.1f} MB/s")
+        original, streaming = results["original"], results["streaming"]
+        same = (original["by_severity"] == streaming["by_severity"]
+                and original["failed_logins"] == streaming["failed_logins"]
+                and sorted(original["suspicious_ips"]) == sorted(streaming["suspicious_ips"])
+                and original["critical_events"] == streaming["critical_events"])
+        print(f"  Speed-up: {timings['original'] / timings['streaming']:.2f}x  (identical results: {same})")
+        return timings
+    finally:
+        if os.path.exists(log_filename): os.remove(log_filename)
+
+def benchmark_parallel_log_scan(size_mb=None, log_filename="benchmark_parallel.log"):
+    """Measure analyze_security_log() throughput with 1, 2, 4, ... worker processes."""
+    size_mb = size_mb or log_benchmark_mb()
+    file_bytes = generate_benchmark_log(log_filename, size_mb)
+    try:
+        timings = {}
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= (os.cpu_count() or 1): worker_counts.append(worker_counts[-1] * 2)
+        for workers in worker_counts:
+            started = time.perf_counter()
+            analyze_security_log(log_filename, workers=workers)
+            timings[workers] = time.perf_counter() - started
+            print(f"  {workers:>3} worker(s) {timings[workers]:8.2f}s  {file_bytes / 1e6 / timings[workers]:8.1f} MB/s"
+                  f"  ({timings[1] / timings[workers]:.2f}x)")
+        return timings
+    finally:
+        if os.path.exists(log_filename): os.remove(log_filename)
+
+def benchmark_bounded_collectors(size_mb=None, log_filename="benchmark_bounded.log"):
+    """Compare peak traced memory of the default collectors with bounded ones."""
+    size_mb = size_mb or max(1, log_benchmark_mb() // 8)
+    generate_benchmark_log(log_filename, size_mb)
+    try:
+        peaks = {}
+        for label, options in (("unbounded", {}),
+                               ("bounded", {"critical_limit": 1000, "critical_sampling": "reservoir",
+                                            "ip_counting": "hll"})):
+            tracemalloc.start()
+            analyze_security_log(log_filename, **options)
+            peaks[label] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {label:<10} peak {peaks[label] / 1e6:8.1f} MB  ({size_mb} MB log)")
+        return peaks
+    finally:
+        if os.path.exists(log_filename): os.remove(log_filename)
+
+def benchmark_compressed_input(size_mb=None, log_filename="benchmark_compressed.log"):
+    """Compare "decompress to disk, then analyze" with streaming decompression."""
+    size_mb = size_mb or max(1, log_benchmark_mb() // 4)
+    generate_benchmark_log(log_filename, size_mb)
+    compressed_filename = f"{log_filename}.gz"
+    unpacked_filename = f"{log_filename}.unpacked"
+    try:
+        with open(log_filename, "rb") as src, gzip.open(compressed_filename, "wb", compresslevel=1) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.remove(log_filename)
+        started = time.perf_counter()
+        with gzip.open(compressed_filename, "rb") as src, open(unpacked_filename, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        analyze_security_log(unpacked_filename)
+        two_pass = time.perf_counter() - started
+        extra_bytes = os.path.getsize(unpacked_filename)
+        os.remove(unpacked_filename)
+        started = time.perf_counter()
+        analyze_security_log(compressed_filename)
+        streaming = time.perf_counter() - started
+        print(f"  decompress to disk + analyze {two_pass:8.2f}s  ({extra_bytes / 1e6:.0f} MB written and re-read)")
+        print(f"  streaming decompression      {streaming:8.2f}s  (0 MB written)")
+        return {"two_pass": two_pass, "streaming": streaming}
+    finally:
+        for f_name in (log_filename, compressed_filename, unpacked_filename):
+            if os.path.exists(f_name): os.remove(f_name)
+
+def run_benchmarks():
+    print("="*50)
+    print("BENCHMARK: analyze_security_log")
+    print("="*50)
+    benchmark_log_scanner()
+    print("\nBENCHMARK: parallel analyze_security_log")
+    benchmark_parallel_log_scan()
+    print("\nBENCHMARK: bounded critical_events / suspicious_ips collectors")
+    benchmark_bounded_collectors()
+    print("\nBENCHMARK: gzip log input")
+    benchmark_compressed_input()
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_log_scanner():
+    all_passed = True
+    previous_directory = os.getcwd()
+    work_directory = tempfile.mkdtemp(prefix="log_scanner_test_")
+    os.chdir(work_directory) # Test files are created here and removed with the directory
+    try:
+        with open("security_engine_test.log", "w") as f:
+            f.write("2023-10-01 10:00:00 INFO Service started\n\n"
+                    "2023-10-01 10:01:00 WARNING Failed login for admin from 203.0.113.42\n"
+                    "2023-10-01 10:02:00 CRITICAL Suspicious traffic from 198.51.100.7 and 198.51.100.8\n"
+                    "2023-10-01 10:03:00 CRITICAL INFO mixed severities resolve to INFO\n"
+                    "2023-10-01 10:04:00 ERROR Connection from 10.0.0.5 reset\n")
+        try:
+            expected = _analyze_security_log_reference("security_engine_test.log")
+            actual = analyze_security_log("security_engine_test.log")
+            assert actual["total_entries"] == expected["total_entries"] == 5
+            assert actual["by_severity"] == expected["by_severity"]
+            assert actual["failed_logins"] == expected["failed_logins"] == 1
+            assert sorted(actual["suspicious_ips"]) == sorted(expected["suspicious_ips"])
+            assert actual["critical_events"] == expected["critical_events"]
+            assert analyze_security_log("missing_engine_test.log")["total_entries"] == 0
+            print("✅ Log Scanner Test 1 (matches original analyze_security_log): PASSED")
+        except AssertionError as e:
+            print(f"❌ Log Scanner Test 1 (matches original analyze_security_log): FAILED - {e}")
+            all_passed = False
+
+        try:
+            reports = list(iter_security_log_stats("security_engine_test.log", report_every=2, batch_bytes=64))
+            assert len(reports) >= 2, "expected intermediate progress reports"
+            assert reports[-1]["total_entries"] == 5 and reports[-1]["critical_event_count"] == 2
+            assert [r["total_entries"] for r in reports] == sorted(r["total_entries"] for r in reports)
+            print("✅ Log Scanner Test 2 (incremental progress reports): PASSED")
+        except AssertionError as e:
+            print(f"❌ Log Scanner Test 2 (incremental progress reports): FAILED - {e}")
+            all_passed = False
+
+        try:
+            chunks = split_log_chunks("security_engine_test.log", 4, min_chunk_bytes=64)
+            assert len(chunks) > 1 and chunks[0][0] == 0
+            assert chunks[-1][1] == os.path.getsize("security_engine_test.log")
+            assert all(prev[1] == nxt[0] for prev, nxt in zip(chunks, chunks[1:]))
+            merged = scan_security_log_parallel("security_engine_test.log", workers=2, min_chunk_bytes=64).stats()
+            expected = analyze_security_log("security_engine_test.log")
+            assert merged["by_severity"] == expected["by_severity"] and merged["total_entries"] == 5
+            assert sorted(merged["suspicious_ips"]) == sorted(expected["suspicious_ips"])
+            assert merged["critical_events"] == expected["critical_events"]
+            print("✅ Log Scanner Test 3 (parallel chunked scan): PASSED")
+        except AssertionError as e:
+            print(f"❌ Log Scanner Test 3 (parallel chunked scan): FAILED - {e}")
+            all_passed = False
+
+        try:
+            bounded = analyze_security_log("security_engine_test.log", critical_limit=1, critical_sampling="last")
+            assert bounded["critical_events"] == expected["critical_events"][-1:] and bounded["critical_event_count"] == 2
+            sketch = DistinctIPCounter("hll")
+            sketch.update(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(50000))
+            assert abs(sketch.count() - 50000) < 50000 * 0.03, f"HyperLogLog estimate {sketch.count()} too far off"
+            assert len(sketch.values()) <= sketch.sample_limit
+            exact = DistinctIPCounter()
+            exact.update(["10.0.0.1", "999.1.1.1", "10.0.0.1"])
+            assert 0x0A000001 in exact.ips and sorted(exact.values()) == ["10.0.0.1", "999.1.1.1"], "exact mode should pack IPs"
+            assert DistinctIPCounter.from_checkpoint(exact.to_checkpoint()).ips == exact.ips
+            print("✅ Log Scanner Test 4 (bounded collectors): PASSED")
+        except AssertionError as e:
+            print(f"❌ Log Scanner Test 4 (bounded collectors): FAILED - {e}")
+            all_passed = False
+
+        try:
+            with open("follow_test.log", "w") as f: f.write("INFO start\nWARNING Failed login from 203.0.113.9\n")
+            assert analyze_security_log("follow_test.log", checkpoint_filename="follow_test.checkpoint")["total_entries"] == 2
+            with open("follow_test.log", "a") as f: f.write("CRITICAL breach\nERROR half-writ")
+            stats = update_security_log_checkpoint("follow_test.log", "follow_test.checkpoint")
+            assert stats["total_entries"] == 3, "partial trailing line must wait for its newline"
+            with open("follow_test.log", "a") as f: f.write("ten line\n")
+            os.rename("follow_test.log", "follow_test.log.1") # Rotation
+            with open("follow_test.log", "w") as f: f.write("INFO new file\n")
+            stats = update_security_log_checkpoint("follow_test.log", "follow_test.checkpoint")
+            assert stats["total_entries"] == 5 and stats["by_severity"]["ERROR"] == 1
+            with open("follow_test.log", "w") as f: f.write("") # Truncation
+            with open("follow_test.log", "a") as f: f.write("INFO again\n")
+            stats = update_security_log_checkpoint("follow_test.log", "follow_test.checkpoint")
+            assert stats["total_entries"] == 6 and stats["suspicious_ips"] == ["203.0.113.9"]
+            try:
+                update_security_log_checkpoint("follow_test.log", "follow_test.checkpoint", ip_counting="hll")
+                assert False, "conflicting options were ignored"
+            except ValueError: pass
+            stats = update_security_log_checkpoint("follow_test.log", "follow_test.checkpoint", critical_sampling="first")
+            assert stats["total_entries"] == 6, "matching options should be accepted"
+            with open("follow_test.log", "a") as f: f.write("CRITICAL event\n" * (CHECKPOINT_CRITICAL_LIMIT + 5))
+            stats = update_security_log_checkpoint("follow_test.log", "follow_test.checkpoint")
+            saved = load_log_checkpoint("follow_test.checkpoint")["scanner"]["critical_events"]
+            assert len(saved["items"]) == CHECKPOINT_CRITICAL_LIMIT and stats["critical_event_count"] == CHECKPOINT_CRITICAL_LIMIT + 6
+            print("✅ Log Scanner Test 5 (checkpointed follow mode): PASSED")
+        except AssertionError as e:
+            print(f"❌ Log Scanner Test 5 (checkpointed follow mode): FAILED - {e}")
+            all_passed = False
+
+        try:
+            with open("security_engine_test.log", "rb") as f: raw_log = f.read()
+            for f_name, opener in (("compressed_test.log.gz", gzip.open), ("compressed_test.log.bz2", bz2.open),
+                                   ("compressed_test.log.xz", lzma.open)):
+                with opener(f_name, "wb") as f: f.write(raw_log)
+                stats = analyze_security_log(f_name, workers=2)
+                assert stats["by_severity"] == expected["by_severity"], f"{f_name} stats differ"
+                assert stats["critical_events"] == expected["critical_events"]
+            with open("compressed_test.log", "wb") as f: f.write(raw_log + b"ERROR bad byte \xff from 10.0.0.9\n")
+            with gzip.open("compressed_test.log.gz", "wb") as f: f.write(raw_log + b"ERROR bad byte \xff from 10.0.0.9\n")
+            plain, packed = analyze_security_log("compressed_test.log"), analyze_security_log("compressed_test.log.gz")
+            assert plain["total_entries"] == packed["total_entries"] == 6, "non-UTF-8 bytes must not hide the log"
+            mixed_breaks = b"INFO a\rCRITICAL b\nWARNING c\r\nERROR d\n"
+            with open("line_breaks.log", "wb") as f: f.write(mixed_breaks)
+            with gzip.open("line_breaks.log.gz", "wb") as f: f.write(mixed_breaks)
+            serial_scan, gzip_scan = SecurityLogScanner(), SecurityLogScanner()
+            for _ in iter_security_log_stats("line_breaks.log", scanner=serial_scan, report_every=0, batch_bytes=8): pass
+            for _ in iter_security_log_stats("line_breaks.log.gz", scanner=gzip_scan, report_every=0): pass
+            parallel_scan = scan_security_log_parallel("line_breaks.log", workers=2, min_chunk_bytes=8)
+            update_security_log_checkpoint("line_breaks.log", "line_breaks.checkpoint", batch_bytes=8)
+            checkpoint_scan = SecurityLogScanner.from_checkpoint(load_log_checkpoint("line_breaks.checkpoint")["scanner"])
+            for scanner in (serial_scan, gzip_scan, parallel_scan, checkpoint_scan):
+                assert scanner.stats()["total_entries"] == 4 and scanner.by_severity["CRITICAL"] == 1, "line breaks differ by path"
+                assert scanner.bytes_read == len(mixed_breaks), f"bytes_read {scanner.bytes_read} != {len(mixed_breaks)}"
+            print("✅ Log Scanner Test 6 (gzip/bz2/xz input and line breaks): PASSED")
+        except AssertionError as e:
+            print(f"❌ Log Scanner Test 6 (gzip/bz2/xz input and line breaks): FAILED - {e}")
+            all_passed = False
+    finally:
+        os.chdir(previous_directory)
+        shutil.rmtree(work_directory, ignore_errors=True)
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_log_scanner()
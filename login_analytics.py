@@ -0,0 +1,234 @@
+"""
+====================================================================
+LOGIN ANALYTICS 📈 - Streaming per-user login counts
+====================================================================
+
+Shared helper for Module 6 (TASK 3: User Login Pattern Analysis).
+
+A hand-written `counts[user] = counts.get(user, 0) + 1` loop is fine for six
+logins, but a real login stream never ends and can contain millions of
+distinct usernames. LoginActivityTracker consumes the stream in batches
+(pre-aggregated with collections.Counter, which counts in C) and offers three
+ways to keep the counts:
+
+- "exact":        a Counter of every user (memory grows with distinct users)
+- "space_saving": the Space-Saving algorithm, which tracks at most `capacity`
+                  users; every user whose true count exceeds total/capacity
+                  is guaranteed to be tracked, with a count that is never
+                  too low and at most total/capacity too high
+- "count_min":    a Count-Min sketch (`depth` rows of `width` counters) for
+                  count estimates of any user, plus the `capacity` heaviest
+                  users seen so far for top-K queries
+
+Run `python login_analytics.py` for the built-in checks and
+`python login_analytics.py --benchmark` for throughput and accuracy numbers.
+"""
+
+import hashlib
+import heapq
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+
+from env_settings import benchmark_scale
+
+TRACKER_MODES = ("exact", "space_saving", "count_min")
+
+class LoginActivityTracker:
+    """Per-user login counts over an unbounded stream; see the module docstring for the modes."""
+
+    def __init__(self, mode="exact", capacity=1000, width=4096, depth=4):
+        if mode not in TRACKER_MODES: raise ValueError(f"Unknown tracker mode: {mode}")
+        self.mode = mode
+        self.capacity = capacity
+        self.total = 0
+        self._tracked = Counter() # Exact counts, or the bounded set of tracked users
+        self._heap = [] # (count, user) entries for finding the smallest tracked user; stale ones are skipped
+        if mode == "count_min":
+            self.width, self.depth = width, depth
+            self._rows = [array("Q", bytes(8 * width)) for _ in range(depth)]
+
+    def update(self, usernames):
+        """Count a batch of logins (any iterable of usernames)."""
+        if not isinstance(usernames, (list, tuple)): usernames = list(usernames)
+        self.total += len(usernames)
+        if self.mode == "exact":
+            self._tracked.update(usernames) # Counted in C, no per-login Python code
+            return
+        add = self._add_space_saving if self.mode == "space_saving" else self._add_count_min
+        for username, logins in Counter(usernames).items(): add(username, logins)
+
+    def add(self, username, logins=1):
+        """Count `logins` logins for one user."""
+        self.total += logins
+        if self.mode == "exact": self._tracked[username] += logins
+        elif self.mode == "space_saving": self._add_space_saving(username, logins)
+        else: self._add_count_min(username, logins)
+
+    def count(self, username):
+        """Login count for one user: exact, or an upper-bound estimate in the sketch modes."""
+        if self.mode == "count_min": return self._estimate(username)
+        return self._tracked.get(username, 0)
+
+    def counts(self):
+        """{username: count} for every tracked user (all users in "exact" mode)."""
+        return dict(self._tracked)
+
+    def top(self, k):
+        """The k most active users as (username, count) pairs, busiest first."""
+        return self._tracked.most_common(k)
+
+    def above(self, threshold):
+        """Usernames with more than `threshold` logins, busiest first."""
+        return [username for username, logins in self._tracked.most_common() if logins > threshold]
+
+    def _smallest_tracked(self):
+        heap, tracked = self._heap, self._tracked
+        while heap[0][0] != tracked.get(heap[0][1]): heapq.heappop(heap) # Drop stale entries
+        return heap[0]
+
+    def _track(self, username, logins):
+        self._tracked[username] = logins
+        heapq.heappush(self._heap, (logins, username))
+        if len(self._heap) > 4 * self.capacity: # Rebuild before stale entries pile up
+            self._heap = [(count, user) for user, count in self._tracked.items()]
+            heapq.heapify(self._heap)
+
+    def _add_space_saving(self, username, logins):
+        tracked = self._tracked
+        if username in tracked or len(tracked) < self.capacity:
+            self._track(username, tracked.get(username, 0) + logins)
+            return
+        floor, evicted = self._smallest_tracked() # The newcomer inherits the evicted user's count
+        del tracked[evicted]
+        self._track(username, floor + logins)
+
+    def _slots(self, username):
+        digest = hashlib.blake2b(username.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + row * second) % self.width for row in range(self.depth)]
+
+    def _estimate(self, username):
+        return min(row[slot] for row, slot in zip(self._rows, self._slots(username)))
+
+    def _add_count_min(self, username, logins):
+        estimate = None
+        for row, slot in zip(self._rows, self._slots(username)):
+            row[slot] += logins
+            estimate = row[slot] if estimate is None else min(estimate, row[slot])
+        tracked = self._tracked
+        if username in tracked or len(tracked) < self.capacity:
+            self._track(username, estimate)
+        elif estimate > self._smallest_tracked()[0]:
+            del tracked[self._smallest_tracked()[1]]
+            self._track(username, estimate)
+
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python login_analytics.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+def _benchmark_logins(login_count, user_count, seed=4):
+    # Skewed activity: a few service accounts and admins dominate, most users log in rarely
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(user_count)]
+    return rng.choices([f"user{rank}" for rank in range(user_count)], weights, k=login_count)
+
+def benchmark_login_tracker(login_count=None, user_count=None, batch_size=10_000, k=20):
+    """Throughput, memory and top-K accuracy of each mode against the manual dict loop."""
+    login_count = login_count or int(2_000_000 * benchmark_scale())
+    user_count = user_count or int(500_000 * benchmark_scale())
+    logins = _benchmark_logins(login_count, user_count)
+    print(f"  {login_count:,} logins from up to {user_count:,} users")
+
+    def manual_loop():
+        counts = {}
+        for username in logins: counts[username] = counts.get(username, 0) + 1
+        return counts
+
+    def best_of_two(function, *args):
+        timings = []
+        for _ in range(2):
+            started = time.perf_counter()
+            result = function(*args)
+            timings.append(time.perf_counter() - started)
+        return result, min(timings)
+
+    manual_counts, manual_seconds = best_of_two(manual_loop)
+    print(f"  {'manual dict loop':<14} {login_count / manual_seconds:12,.0f} logins/sec")
+    true_top = {user for user, _ in Counter(manual_counts).most_common(k)}
+
+    def run(mode):
+        tracker = LoginActivityTracker(mode)
+        for start in range(0, login_count, batch_size): tracker.update(logins[start:start + batch_size])
+        return tracker
+
+    for mode in TRACKER_MODES:
+        tracker, elapsed = best_of_two(run, mode)
+        tracemalloc.start() # Separate traced run: tracing slows allocation-heavy code down
+        traced = run(mode)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del traced
+        recall = len(true_top & {user for user, _ in tracker.top(k)}) / k
+        worst_error = max(tracker.count(user) - manual_counts[user] for user in true_top)
+        print(f"  {mode:<14} {login_count / elapsed:12,.0f} logins/sec  {memory / 1e6:7.1f} MB  "
+              f"top-{k} recall {recall:.0%}  worst top-{k} overcount {worst_error:,}")
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: streaming login analytics")
+    print("="*50)
+    benchmark_login_tracker()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_login_tracker():
+    all_passed = True
+    try:
+        tracker = LoginActivityTracker()
+        tracker.update(["admin", "user1", "guest"])
+        tracker.update(iter(["admin", "user2", "admin"]))
+        assert tracker.counts() == {"admin": 3, "user1": 1, "guest": 1, "user2": 1}
+        assert tracker.above(2) == ["admin"] and tracker.top(1) == [("admin", 3)] and tracker.total == 6
+        tracker.add("guest", 4)
+        assert tracker.above(2) == ["guest", "admin"] and tracker.total == 10
+        print("✅ Login Analytics Test 1 (exact counts): PASSED")
+    except AssertionError as e:
+        print(f"❌ Login Analytics Test 1 (exact counts): FAILED - {e}")
+        all_passed = False
+
+    try:
+        logins = _benchmark_logins(50_000, 20_000)
+        exact = Counter(logins)
+        heavy = [user for user, logins_seen in exact.items() if logins_seen > len(logins) / 200]
+        for mode in ("space_saving", "count_min"):
+            tracker = LoginActivityTracker(mode, capacity=200, width=2048)
+            for start in range(0, len(logins), 1000): tracker.update(logins[start:start + 1000])
+            assert len(tracker.counts()) <= 200, f"{mode} tracked too many users"
+            assert all(tracker.count(user) >= exact[user] for user in heavy), f"{mode} undercounted"
+            if mode == "space_saving":
+                assert set(heavy) <= set(tracker.counts()), "a heavy hitter was evicted"
+                assert all(tracker.count(user) - exact[user] <= len(logins) / 200 for user in heavy), "error bound exceeded"
+            assert [user for user, _ in tracker.top(5)] == [user for user, _ in exact.most_common(5)], f"{mode} top-5 wrong"
+        try:
+            LoginActivityTracker("approximate")
+            raise AssertionError("unknown mode accepted")
+        except ValueError:
+            pass
+        print("✅ Login Analytics Test 2 (Space-Saving / Count-Min bounds): PASSED")
+    except AssertionError as e:
+        print(f"❌ Login Analytics Test 2 (Space-Saving / Count-Min bounds): FAILED - {e}")
+        all_passed = False
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_login_tracker()
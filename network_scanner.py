@@ -0,0 +1,302 @@
+"""
+====================================================================
+NETWORK SCANNER 📡 - Concurrent TCP connect scans over large ranges
+====================================================================
+
+Shared helper for Module 7 (TOOL 2: Network Reconnaissance Scanner).
+
+Probing hosts one at a time means waiting out every connect timeout in
+turn. scan_hosts_async() keeps up to `concurrency` connections in flight on
+one asyncio event loop, and targets ("10.0.0.0/16", "10.0.0.5-9", a single
+IP, minus any excluded ranges) are expanded lazily as 32-bit integers, so
+even a /8 never exists as a list of strings. Only scan networks you are
+authorized to test.
+
+Run `python network_scanner.py` for the built-in checks (loopback only) and
+`python network_scanner.py --benchmark` for a loopback sweep.
+"""
+
+import asyncio
+import bisect
+import concurrent.futures
+import ipaddress
+import itertools
+import socket
+import sys
+import time
+import tracemalloc
+
+from env_settings import benchmark_scale
+from packed_ip import format_ipv4, parse_ipv4
+
+SCAN_DEFAULT_CONCURRENCY = 256
+SCAN_DEFAULT_TIMEOUT = 0.5 # Seconds allowed for each TCP connect
+
+def scan_network_range(network_base, start_host=None, end_host=None, target_port=80, ports=None, exclude=None,
+                       concurrency=SCAN_DEFAULT_CONCURRENCY, timeout=SCAN_DEFAULT_TIMEOUT, collect_closed=True):
+    # Real TCP connect scan; `ports` (a list) overrides the single target_port.
+    # network_base is either a /24-style prefix used with start_host/end_host
+    # ("127.0.0", 1, 3) or target specs: "10.0.0.0/16", "10.0.0.5-10.0.0.9",
+    # a single IP, or a list of these. `exclude` takes the same specs.
+    # A host is "open" when any of the ports accepts a connection. As in the
+    # original loop, an end_host below start_host scans nothing.
+    if start_host is not None or end_host is not None:
+        for host in (start_host, end_host):
+            if type(host) is not int or not 0 <= host <= 255:
+                raise ValueError(f"start_host and end_host must both be host numbers 0-255, "
+                                 f"got {start_host!r} and {end_host!r}")
+        first = ip_to_int(f"{network_base}.{start_host}")
+        targets = [(first, first + end_host - start_host)] if end_host >= start_host else []
+    else:
+        targets = [network_base] if isinstance(network_base, str) else network_base
+    hosts = expand_scan_targets(targets, exclude or [])
+    scan = scan_hosts_async(hosts, ports or [target_port], concurrency, timeout, collect_closed)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(scan)
+    # Called from code that is already running an event loop (asyncio.run() refuses
+    # to nest): give the scan its own loop in a helper thread and wait for it
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        return executor.submit(asyncio.run, scan).result()
+
+# Targets are handled as 32-bit integers and only turned into strings when a
+# connection is attempted, so a /8 never exists as 16 million strings in memory.
+def ip_to_int(ip):
+    return parse_ipv4(ip) if ip.count(".") == 3 else int(ipaddress.IPv4Address(ip))
+
+int_to_ip = format_ipv4
+
+def parse_target_range(spec, hosts_only=True):
+    """
+    Turn "10.0.0.0/24", "10.0.0.5-10.0.0.9", "10.0.0.5-9", "10.0.0.7" or an (int, int) pair into inclusive int bounds.
+    Raises ValueError for malformed specs, a short-form last octet above 255 and ranges that end before they start.
+    """
+    if isinstance(spec, tuple):
+        if spec[1] < spec[0]: raise ValueError(f"Range ends before it starts: {spec!r}")
+        return spec
+    spec = spec.strip()
+    if "/" in spec:
+        network = ipaddress.IPv4Network(spec, strict=False)
+        first, last = int(network.network_address), int(network.broadcast_address)
+        # Like ipaddress' hosts(): targets skip network and broadcast addresses unless /31 or /32
+        return (first + 1, last - 1) if hosts_only and network.prefixlen < 31 else (first, last)
+    if "-" in spec:
+        start, end = (part.strip() for part in spec.split("-", 1))
+        first = ip_to_int(start)
+        if "." in end:
+            last = ip_to_int(end)
+        elif end.isdigit() and int(end) <= 255:
+            last = (first & 0xFFFFFF00) | int(end)
+        else:
+            raise ValueError(f"Invalid last octet in {spec!r}")
+        if last < first: raise ValueError(f"Range ends before it starts: {spec!r}")
+        return first, last
+    value = ip_to_int(spec)
+    return value, value
+
+def _merge_ranges(ranges):
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1: merged[-1][1] = max(merged[-1][1], last)
+        else: merged.append([first, last])
+    return merged
+
+def expand_scan_targets(targets, exclude=()):
+    """Lazily yield target IPs as integers, in target order, skipping excluded ranges."""
+    excluded = _merge_ranges(parse_target_range(spec, hosts_only=False) for spec in exclude)
+    excluded_starts = [first for first, _ in excluded]
+    for spec in targets:
+        current, last = parse_target_range(spec)
+        while current <= last:
+            slot = bisect.bisect_right(excluded_starts, current) - 1
+            if slot >= 0 and excluded[slot][1] >= current:
+                current = excluded[slot][1] + 1 # Jump over the whole excluded block
+                continue
+            stop = last
+            if slot + 1 < len(excluded): stop = min(stop, excluded[slot + 1][0] - 1)
+            yield from range(current, stop + 1)
+            current = stop + 1
+
+def count_scan_targets(targets, exclude=()):
+    """Number of addresses expand_scan_targets() would yield, without expanding them."""
+    excluded = _merge_ranges(parse_target_range(spec, hosts_only=False) for spec in exclude)
+    total = 0
+    for spec in targets:
+        first, last = parse_target_range(spec)
+        total += max(0, last - first + 1)
+        for ex_first, ex_last in excluded:
+            total -= max(0, min(last, ex_last) - max(first, ex_first) + 1)
+    return total
+
+async def _probe_tcp_port(ip, port, timeout):
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try: await writer.wait_closed()
+    except OSError: pass
+    return True
+
+async def scan_hosts_async(hosts, ports, concurrency=SCAN_DEFAULT_CONCURRENCY, timeout=SCAN_DEFAULT_TIMEOUT,
+                           collect_closed=True):
+    """
+    Connect-scan every (host, port) pair with at most `concurrency` connections
+    in flight. `hosts` may be any iterable of IP strings or integers and is
+    consumed lazily by a fixed set of worker coroutines, so memory does not grow
+    with the number of targets. Only hosts still being probed are tracked.
+    Returns {"open_hosts": [...], "closed_hosts": [...], "open_ports": {ip: [ports]},
+    "closed_count": n}, with hosts in input order. Pass collect_closed=False on
+    huge sweeps to only count closed hosts.
+    """
+    ports = list(ports)
+    targets = ((seq, host, port) for seq, host in enumerate(hosts) for port in ports)
+    in_flight = {} # seq -> [ports still to probe, open ports found]
+    open_found, closed_found = [], []
+    closed_count = 0
+
+    async def worker():
+        nonlocal closed_count
+        for seq, host, port in targets:
+            ip = int_to_ip(host) if isinstance(host, int) else host
+            state = in_flight.setdefault(seq, [len(ports), []])
+            if await _probe_tcp_port(ip, port, timeout): state[1].append(port)
+            state[0] -= 1
+            if state[0]: continue
+            del in_flight[seq]
+            if state[1]: open_found.append((seq, ip, sorted(state[1])))
+            else:
+                closed_count += 1
+                if collect_closed: closed_found.append((seq, ip))
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    open_found.sort()
+    closed_found.sort()
+    return {
+        "open_hosts": [ip for _, ip, _ in open_found],
+        "closed_hosts": [ip for _, ip in closed_found],
+        "open_ports": {ip: found for _, ip, found in open_found},
+        "closed_count": closed_count,
+    }
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python network_scanner.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+def benchmark_network_scan(prefix_length=None):
+    """Sweep a loopback CIDR block (127.0.0.0/16 by default): sequential sample vs concurrent engine."""
+    prefix_length = prefix_length or (16 if benchmark_scale() >= 1 else 20)
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(128)
+    port = listener.getsockname()[1]
+    block = f"127.0.0.0/{prefix_length}"
+    host_count = count_scan_targets([block])
+    try:
+        started = time.perf_counter()
+        scan_network_range(["127.0.0.1-127.0.1.244"], ports=[port], concurrency=1)
+        per_host = (time.perf_counter() - started) / 500
+        print(f"  sequential (1 at a time)  {per_host * 1e6:8.1f} us/host  -> ~{per_host * host_count:.1f}s for {host_count:,} hosts")
+        for concurrency in (64, 512):
+            started = time.perf_counter()
+            result = scan_network_range(block, ports=[port], concurrency=concurrency, collect_closed=False)
+            elapsed = time.perf_counter() - started
+            print(f"  concurrency {concurrency:<4}          {elapsed:8.2f}s for {host_count:,} hosts "
+                  f"({len(result['open_hosts'])} open, {result['closed_count']:,} closed)")
+    finally:
+        listener.close()
+
+def benchmark_target_expansion():
+    """Peak memory of lazily expanding a /8 versus materialising a /12 as strings."""
+    tracemalloc.start()
+    expanded = sum(1 for _ in expand_scan_targets(["10.0.0.0/8"], exclude=["10.128.0.0/9"]))
+    lazy_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  lazy /8 minus /9 ({expanded:,} targets)     peak {lazy_peak / 1e6:8.2f} MB")
+    tracemalloc.start()
+    strings = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(1 << 20)]
+    list_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  string list /12 ({len(strings):,} targets)  peak {list_peak / 1e6:8.2f} MB"
+          f"  (a /8 would need ~{list_peak * 16 / 1e9:.1f} GB)")
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: scan_network_range (loopback sweep)")
+    print("="*50)
+    benchmark_network_scan()
+    print("\nBENCHMARK: scan target expansion memory")
+    benchmark_target_expansion()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_network_scanner():
+    all_passed = True
+    listeners = []
+    try:
+        for address in ("127.0.0.2", "127.0.0.3"):
+            listener = socket.socket()
+            listener.bind((address, 0 if not listeners else listeners[0].getsockname()[1]))
+            listener.listen(8)
+            listeners.append(listener)
+        open_port = listeners[0].getsockname()[1]
+        extra = socket.socket()
+        extra.bind(("127.0.0.3", 0))
+        extra.listen(8)
+        listeners.append(extra)
+        extra_port = extra.getsockname()[1]
+        result = scan_network_range("127.0.0", 1, 4, ports=[open_port, extra_port], timeout=1.0)
+        assert result["open_hosts"] == ["127.0.0.2", "127.0.0.3"], result
+        assert result["closed_hosts"] == ["127.0.0.1", "127.0.0.4"], result
+        assert result["open_ports"] == {"127.0.0.2": [open_port], "127.0.0.3": sorted([open_port, extra_port])}
+        assert scan_network_range("127.0.0", 4, 1) == {"open_hosts": [], "closed_hosts": [], "open_ports": {},
+                                                       "closed_count": 0}, "a reversed range should scan nothing"
+        for bad in ((1, None), (None, 4), (1, 256), ("1", 4), (1.0, 4)):
+            try:
+                scan_network_range("127.0.0", *bad)
+                raise AssertionError(f"host bounds {bad!r} should be rejected")
+            except ValueError:
+                pass
+
+        async def scan_from_event_loop():
+            return scan_network_range("127.0.0", 2, 2, ports=[open_port], timeout=1.0)
+        assert asyncio.run(scan_from_event_loop())["open_hosts"] == ["127.0.0.2"], "scan inside a running loop failed"
+        print("✅ Network Scanner Test 1 (asyncio scan_network_range): PASSED")
+    except (OSError, AssertionError) as e:
+        print(f"❌ Network Scanner Test 1 (asyncio scan_network_range): FAILED - {e}")
+        all_passed = False
+    finally:
+        for listener in listeners: listener.close()
+
+    try:
+        targets = ["192.168.1.0/29", "10.0.0.250-10.0.1.2", "172.16.0.9", "10.0.0.5-7"]
+        exclude = ["192.168.1.2-192.168.1.3", "10.0.0.255/32"]
+        expanded = [int_to_ip(value) for value in expand_scan_targets(targets, exclude)]
+        assert expanded == ["192.168.1.1", "192.168.1.4", "192.168.1.5", "192.168.1.6",
+                            "10.0.0.250", "10.0.0.251", "10.0.0.252", "10.0.0.253", "10.0.0.254",
+                            "10.0.1.0", "10.0.1.1", "10.0.1.2", "172.16.0.9",
+                            "10.0.0.5", "10.0.0.6", "10.0.0.7"], expanded
+        assert count_scan_targets(targets, exclude) == len(expanded)
+        assert count_scan_targets(["10.0.0.0/8"], ["10.1.0.0/16"]) == (1 << 24) - 2 - (1 << 16)
+        first_hosts = list(itertools.islice(expand_scan_targets(["10.0.0.0/8"]), 3))
+        assert [int_to_ip(v) for v in first_hosts] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+        for bad in ("10.0.0.5-300", "10.0.0.9-5", "10.0.0.9-10.0.0.1", "10.0.0.5-x", "10.0.0.5--1", (9, 5)):
+            try:
+                parse_target_range(bad)
+                raise AssertionError(f"{bad!r} should be rejected")
+            except ValueError:
+                pass
+        print("✅ Network Scanner Test 2 (CIDR target expansion): PASSED")
+    except (ValueError, AssertionError) as e:
+        print(f"❌ Network Scanner Test 2 (CIDR target expansion): FAILED - {e}")
+        all_passed = False
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_network_scanner()
@@ -0,0 +1,193 @@
+"""
+====================================================================
+PACKED IPv4 ADDRESSES 📦 - One int instead of one string per address
+====================================================================
+
+Shared helper for Modules 6, 7 and 8 (ip_access_index.py, network_scanner.py,
+ip_classification.py and log_scanner.py).
+
+A dotted string such as "192.168.1.1" costs ~60 bytes and has to be split and
+int()-ed again every time it is inspected. Packed into a 32-bit integer it
+costs 28 bytes as a Python int (4 bytes inside an array('I')), hashes and
+compares in one step, and ranges become simple arithmetic.
+
+- parse_ipv4 / format_ipv4: strict dotted-quad <-> int conversion
+- ipv4_category: "private", "loopback", "multicast" or "public" from the int
+- PackedIPv4: an int subclass that prints as a dotted quad
+- pack_ipv4_many / format_ipv4_many: bulk conversion to and from array('I')
+
+Run `python packed_ip.py` for the built-in checks and
+`python packed_ip.py --benchmark` for string vs packed timings.
+"""
+
+import random
+import socket
+import sys
+import time
+import tracemalloc
+from array import array
+
+from env_settings import benchmark_scale
+
+def parse_ipv4(ip):
+    """Dotted-quad string -> 32-bit int. Raises ValueError for anything else (including leading zeros)."""
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except (OSError, TypeError):
+        raise ValueError(f"Invalid IPv4 address: {ip!r}") from None
+
+def format_ipv4(value):
+    """32-bit int -> dotted-quad string."""
+    return socket.inet_ntop(socket.AF_INET, value.to_bytes(4, "big"))
+
+def parse_cidr(spec):
+    """
+    "a.b.c.d/n" (or a bare address, meaning /32) -> (network_int, prefix_length).
+    Host bits below the prefix are ignored, so "10.1.2.3/8" means 10.0.0.0/8.
+    """
+    if not isinstance(spec, str): raise ValueError(f"Invalid CIDR block: {spec!r}")
+    address, _, prefix = spec.partition("/")
+    prefix_length = 32
+    if prefix:
+        if not prefix.isdigit() or int(prefix) > 32: raise ValueError(f"Invalid prefix length in {spec!r}")
+        prefix_length = int(prefix)
+    mask = (0xFFFFFFFF << (32 - prefix_length)) & 0xFFFFFFFF
+    return parse_ipv4(address) & mask, prefix_length
+
+def ipv4_category(value):
+    """Classify a packed address the way Module 7's validate_ip_address_conceptual() does."""
+    first_octet = value >> 24
+    if first_octet == 10 or value >> 20 == 0xAC1 or value >> 16 == 0xC0A8: return "private" # 10/8, 172.16/12, 192.168/16
+    if first_octet == 127: return "loopback"
+    if 224 <= first_octet <= 239: return "multicast"
+    return "public"
+
+class PackedIPv4(int):
+    """
+    An IPv4 address stored as its 32-bit integer value. It behaves as an int
+    (hashing, ordering, arithmetic, use as a dict key or array item) but prints
+    as a dotted quad.
+    """
+    __slots__ = ()
+
+    def __new__(cls, value):
+        if isinstance(value, str): value = parse_ipv4(value)
+        if not 0 <= value <= 0xFFFFFFFF: raise ValueError(f"IPv4 value out of range: {value}")
+        return super().__new__(cls, value)
+
+    def __str__(self):
+        return format_ipv4(self)
+
+    def __repr__(self):
+        return f"PackedIPv4('{format_ipv4(self)}')"
+
+    def __format__(self, spec):
+        # Text formats (f"{ip}", f"{ip:>15}") use the dotted quad; numeric ones (f"{ip:08x}") the int
+        if spec and spec[-1] not in "s<>^" and not spec[-1].isdigit(): return int.__format__(self, spec)
+        return format(str(self), spec)
+
+    @property
+    def category(self):
+        return ipv4_category(self)
+
+    @property
+    def octets(self):
+        return tuple(self.to_bytes(4, "big"))
+
+def pack_ipv4_many(ips, skip_invalid=False):
+    """Iterable of dotted strings -> array('I'). Invalid entries raise ValueError, or are dropped with skip_invalid."""
+    packed = array("I")
+    append = packed.append
+    inet_pton, from_bytes, AF_INET = socket.inet_pton, int.from_bytes, socket.AF_INET
+    for ip in ips:
+        try:
+            append(from_bytes(inet_pton(AF_INET, ip), "big"))
+        except (OSError, TypeError):
+            if not skip_invalid: raise ValueError(f"Invalid IPv4 address: {ip!r}") from None
+    return packed
+
+def format_ipv4_many(values):
+    """Iterable of packed addresses -> list of dotted strings."""
+    inet_ntop, AF_INET = socket.inet_ntop, socket.AF_INET
+    return [inet_ntop(AF_INET, value.to_bytes(4, "big")) for value in values]
+
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python packed_ip.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+def _split_and_classify(ip):
+    # The string-based approach: re-split and int() the octets on every call
+    octets = [int(part) for part in ip.split(".")]
+    first_octet = octets[0]
+    if first_octet == 10 or (first_octet == 172 and 16 <= octets[1] <= 31) or (first_octet == 192 and octets[1] == 168): return "private"
+    if first_octet == 127: return "loopback"
+    if 224 <= first_octet <= 239: return "multicast"
+    return "public"
+
+def benchmark_packed_ips(address_count=None):
+    """Memory of a million addresses as strings vs packed, and repeated classification cost."""
+    address_count = address_count or int(1_000_000 * benchmark_scale())
+    rng = random.Random(3)
+    for label, build in (("list of str", lambda: [format_ipv4(rng.getrandbits(32)) for _ in range(address_count)]),
+                         ("set of str", lambda: {format_ipv4(rng.getrandbits(32)) for _ in range(address_count)}),
+                         ("set of int", lambda: {rng.getrandbits(32) for _ in range(address_count)}),
+                         ("array('I')", lambda: array("I", (rng.getrandbits(32) for _ in range(address_count))))):
+        tracemalloc.start()
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        print(f"  {label:<12} {size / address_count:6.1f} bytes/address")
+
+    strings = [format_ipv4(rng.getrandbits(32)) for _ in range(address_count)]
+    started = time.perf_counter()
+    for ip in strings: _split_and_classify(ip)
+    split_seconds = time.perf_counter() - started
+    packed = pack_ipv4_many(strings)
+    started = time.perf_counter()
+    for value in packed: ipv4_category(value)
+    packed_seconds = time.perf_counter() - started
+    print(f"  classify, re-splitting strings {address_count / split_seconds:12,.0f} IPs/sec")
+    print(f"  classify, packed ints          {address_count / packed_seconds:12,.0f} IPs/sec")
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: packed IPv4 addresses")
+    print("="*50)
+    benchmark_packed_ips()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_packed_ip():
+    try:
+        ip = PackedIPv4("192.168.1.10")
+        assert ip == 0xC0A8010A and str(ip) == "192.168.1.10" and f"{ip}" == "192.168.1.10" and f"{ip:x}" == "c0a8010a"
+        assert f"{ip:>14}" == "  192.168.1.10"
+        assert ip.category == "private" and ip.octets == (192, 168, 1, 10)
+        assert {ip: 1}[0xC0A8010A] == 1 and PackedIPv4(ip + 1) == PackedIPv4("192.168.1.11")
+        samples = {"10.1.2.3": "private", "172.16.0.1": "private", "172.32.0.1": "public", "192.169.0.1": "public",
+                   "127.0.0.1": "loopback", "224.0.0.1": "multicast", "239.255.255.255": "multicast", "8.8.8.8": "public"}
+        assert {text: ipv4_category(parse_ipv4(text)) for text in samples} == samples
+        assert all(_split_and_classify(text) == category for text, category in samples.items())
+        packed = pack_ipv4_many(["1.2.3.4", "bad", "255.255.255.255"], skip_invalid=True)
+        assert packed.typecode == "I" and format_ipv4_many(packed) == ["1.2.3.4", "255.255.255.255"]
+        for bad in ("1.2.3", "1.2.3.256", "01.2.3.4", " 1.2.3.4", None):
+            try:
+                parse_ipv4(bad)
+                raise AssertionError(f"{bad!r} should be rejected")
+            except ValueError:
+                pass
+        print("✅ Packed IP Test (parse, format, classify): PASSED")
+        return True
+    except AssertionError as e:
+        print(f"❌ Packed IP Test (parse, format, classify): FAILED - {e}")
+        return False
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_packed_ip()
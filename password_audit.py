@@ -0,0 +1,178 @@
+"""
+====================================================================
+PASSWORD AUDIT 🔑 - Single-pass password strength scoring
+====================================================================
+
+Shared helper for Module 7 (TOOL 1: Password Security Analyzer).
+
+Scoring a password with five `any(...)` scans walks it five times and builds
+a fresh recommendation list on every call. Here one str.translate() call maps
+the password to its set of character classes, and the score, strength and
+recommendations for each of the 32 possible outcomes are computed once up
+front. analyze_passwords_batch() streams a whole credential dump through it,
+optionally across a process pool.
+
+Run `python password_audit.py` for the built-in checks and
+`python password_audit.py --benchmark` for passwords/sec numbers.
+"""
+
+import itertools
+import os
+import random
+import string
+import sys
+import time
+
+from env_settings import benchmark_scale
+from worker_pools import imap_in_processes
+
+PASSWORD_SPECIAL_CHARACTERS = "!@#$%^&*"
+PASSWORD_MIN_LENGTH = 8
+# Character-class bits, plus the recommendation given when a class is missing
+PASSWORD_CLASS_RULES = (
+    (1, "Add uppercase letters."),
+    (2, "Add lowercase letters."),
+    (4, "Add numbers."),
+    (8, f"Add special characters ({PASSWORD_SPECIAL_CHARACTERS})."),
+)
+PASSWORD_LENGTH_RECOMMENDATION = f"Ensure password is at least {PASSWORD_MIN_LENGTH} characters."
+
+# One str.translate() call turns a password into its set of character classes:
+# ASCII letters/digits/specials map to a class letter and other ASCII is dropped.
+_PASSWORD_CLASS_TABLE = str.maketrans(
+    {**{chr(i): None for i in range(128)},
+     **{c: "U" for c in string.ascii_uppercase}, **{c: "L" for c in string.ascii_lowercase},
+     **{c: "D" for c in string.digits}, **{c: "S" for c in PASSWORD_SPECIAL_CHARACTERS}})
+_PASSWORD_CLASS_MASKS = {
+    frozenset(combo): sum({"U": 1, "L": 2, "D": 4, "S": 8}[c] for c in combo)
+    for size in range(5) for combo in itertools.combinations("ULDS", size)
+}
+
+def _password_strength_label(score):
+    if score <= 40: return "Weak"
+    elif score <= 60: return "Fair"
+    elif score <= 80: return "Good"
+    return "Strong"
+
+# There are only 32 possible outcomes (4 class bits x long-enough or not),
+# so every score/strength/recommendation combination is precomputed.
+def _build_password_verdicts():
+    verdicts = {}
+    for mask in range(16):
+        for long_enough in (False, True):
+            recommendations = [] if long_enough else [PASSWORD_LENGTH_RECOMMENDATION]
+            recommendations += [advice for bit, advice in PASSWORD_CLASS_RULES if not mask & bit]
+            score = 20 * (long_enough + sum(1 for bit, _ in PASSWORD_CLASS_RULES if mask & bit))
+            verdicts[mask, long_enough] = (score, _password_strength_label(score), tuple(recommendations))
+    return verdicts
+
+_PASSWORD_VERDICTS = _build_password_verdicts()
+
+def _password_class_mask(password_string):
+    mask = _PASSWORD_CLASS_MASKS.get(frozenset(password_string.translate(_PASSWORD_CLASS_TABLE)))
+    if mask is not None: return mask
+    # Non-ASCII characters present: classify them the same way str.isupper() etc. do
+    mask = 0
+    for c in password_string:
+        if c.isupper(): mask |= 1
+        if c.islower(): mask |= 2
+        if c.isdigit(): mask |= 4
+        if c in PASSWORD_SPECIAL_CHARACTERS: mask |= 8
+    return mask
+
+def analyze_password(password_string):
+    score, strength, recommendations = _PASSWORD_VERDICTS[
+        _password_class_mask(password_string), len(password_string) >= PASSWORD_MIN_LENGTH]
+    return {"score": score, "strength": strength, "recommendations": list(recommendations)}
+
+def _analyze_password_chunk(passwords):
+    # Worker entry point for analyze_passwords_batch
+    return [analyze_password(pwd) for pwd in passwords]
+
+def analyze_passwords_batch(passwords, workers=1, chunk_size=10000):
+    """
+    Analyze an iterable of passwords (e.g. a credential dump, read lazily) and
+    yield one analyze_password() result per password, in input order. With
+    workers > 1 (or None for one per CPU) chunks are scored in a pool of
+    forked workers (see worker_pools.py).
+    """
+    if workers == 1:
+        for password in passwords: yield analyze_password(password)
+        return
+    passwords_iter = iter(passwords)
+    chunks = iter(lambda: list(itertools.islice(passwords_iter, chunk_size)), [])
+    for results in imap_in_processes(_analyze_password_chunk, chunks, workers):
+        yield from results
+
+def _analyze_password_reference(password_string):
+    # Straightforward multi-pass version, kept as the benchmark baseline
+    score = 0
+    recommendations = []
+    if len(password_string) >= 8: score += 20
+    else: recommendations.append("Ensure password is at least 8 characters.")
+    if any(c.isupper() for c in password_string): score += 20
+    else: recommendations.append("Add uppercase letters.")
+    if any(c.islower() for c in password_string): score += 20
+    else: recommendations.append("Add lowercase letters.")
+    if any(c.isdigit() for c in password_string): score += 20
+    else: recommendations.append("Add numbers.")
+    if any(c in "!@#$%^&*" for c in password_string): score += 20
+    else: recommendations.append("Add special characters (!@#$%^&*).")
+    return {"score": score, "strength": _password_strength_label(score), "recommendations": recommendations}
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python password_audit.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+def generate_benchmark_passwords(count, seed=42):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*-_."
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(4, 16))) for _ in range(count)]
+
+def benchmark_password_batch(count=None):
+    """Compare passwords/sec of a per-call multi-pass loop with analyze_passwords_batch()."""
+    count = count or int(500_000 * benchmark_scale())
+    passwords = generate_benchmark_passwords(count)
+    timings = {}
+    runs = [("multi-pass loop", lambda: [_analyze_password_reference(p) for p in passwords]),
+            ("batch (1 process)", lambda: list(analyze_passwords_batch(passwords)))]
+    if (os.cpu_count() or 1) > 1:
+        runs.append((f"batch ({os.cpu_count()} processes)", lambda: list(analyze_passwords_batch(passwords, workers=None))))
+    for label, run in runs:
+        started = time.perf_counter()
+        run()
+        timings[label] = time.perf_counter() - started
+        print(f"  {label:<22} {timings[label]:7.2f}s  {count / timings[label]:12,.0f} passwords/sec")
+    return timings
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: analyze_password")
+    print("="*50)
+    benchmark_password_batch()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_password_audit():
+    all_passed = True
+    try:
+        samples = ["", "password", "PASSWORD", "Pass1", "SecurePass123!", "MyP@ssw0rd2023", "ÉCOLE2023!",
+                   "pässwörd", "１２３abcDEF", "tab\tand space ", "!@#$%^&*"]
+        for pwd in samples:
+            assert analyze_password(pwd) == _analyze_password_reference(pwd), f"analyze_password mismatch for {pwd!r}"
+        assert list(analyze_passwords_batch(samples)) == [_analyze_password_reference(p) for p in samples]
+        assert list(analyze_passwords_batch(iter(samples), workers=2, chunk_size=3)) == \
+            [_analyze_password_reference(p) for p in samples], "pooled batch results out of order"
+        print("✅ Password Audit Test 1 (analyze_passwords_batch): PASSED")
+    except (NameError, AssertionError) as e:
+        print(f"❌ Password Audit Test 1 (analyze_passwords_batch): FAILED - {e}")
+        all_passed = False
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_password_audit()
@@ -0,0 +1,389 @@
+"""
+====================================================================
+SECURITY ALERTS 🚨 - Templated alerts, unique IDs and de-duplication
+====================================================================
+
+Shared helper for Module 7 (TOOL 4: Incident Alert Generator).
+
+create_security_alert() returns a SecurityAlert whose message is rendered
+from one precompiled template only when it is first read, and
+generate_security_alert() turns it into the lesson's plain dict.
+AlertIdGenerator hands out IDs that stay unique across threads and forked
+processes, and AlertAggregator counts repeats of an alert inside a time
+window instead of raising it again.
+
+Run `python security_alerts.py` for the built-in checks and
+`python security_alerts.py --benchmark` for alerts/sec numbers.
+"""
+
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+from env_settings import alert_dedup_window, alert_summary_interval, benchmark_scale
+
+SEVERITY_ICONS = {"LOW": "🟢", "MEDIUM": "🟡", "HIGH": "🟠", "CRITICAL": "🔴"}
+ALERT_BANNER = "=" * 60
+# The whole message is one precompiled template; only the per-alert fields vary
+ALERT_MESSAGE_TEMPLATE = "\n".join([
+    f"\n{ALERT_BANNER}",
+    "{icon} SECURITY ALERT - {severity} SEVERITY",
+    ALERT_BANNER,
+    "Alert ID: {alert_id}",
+    "Event Type: {event_type}",
+    "Timestamp: {timestamp}",
+    "Affected Systems: {systems}",
+    "Details: {details}",
+    ALERT_BANNER,
+]).format
+
+def create_security_alert(event_type, severity, affected_systems_list, details_string):
+    # The clock is formatted once ("YYYY-MM-DD HH:MM:SS.mmm") and both the ID and
+    # the displayed timestamp are sliced from it. The message itself is only
+    # rendered when formatted_message is first read (see SecurityAlert).
+    stamp = datetime.now().isoformat(" ", "milliseconds")
+    alert_id = ALERT_IDS.next_id(f"{stamp[0:4]}{stamp[5:7]}{stamp[8:10]}-{stamp[11:13]}{stamp[14:16]}{stamp[17:19]}{stamp[20:23]}")
+    return SecurityAlert(alert_id, (event_type, severity, tuple(affected_systems_list), details_string, stamp[:19]))
+
+def generate_security_alert(event_type, severity, affected_systems_list, details_string):
+    """The {"alert_id", "formatted_message"} dict, rendered right away from the cached template."""
+    return create_security_alert(event_type, severity, affected_systems_list, details_string).to_dict()
+
+class AlertIdGenerator:
+    """
+    Unique alert IDs of the form ALERT-YYYYMMDD-HHMMSSmmm-<worker>-<sequence>.
+
+    The time prefix keeps IDs readable and roughly sortable; uniqueness comes
+    from the worker part (the process ID, optionally prefixed with a node name)
+    plus a per-process sequence that never repeats. The sequence is an
+    itertools.count, whose next() is atomic under the GIL, so threads share one
+    generator without a lock. Forked children (process pools) pick up their
+    own PID and restart their sequence automatically.
+    """
+    __slots__ = ("node", "worker", "_sequence", "_second")
+
+    def __init__(self, node=None):
+        self.node = node
+        self._second = (None, "")
+        self.reset()
+
+    def reset(self):
+        pid = os.getpid()
+        self.worker = f"{self.node}.{pid}" if self.node else str(pid)
+        self._sequence = itertools.count(1)
+
+    def next_id(self, time_prefix=None):
+        if time_prefix is None:
+            now = time.time()
+            second, text = self._second
+            if int(now) != second: # Calendar formatting happens at most once per second
+                second = int(now)
+                text = datetime.fromtimestamp(second).strftime("%Y%m%d-%H%M%S")
+                self._second = (second, text)
+            time_prefix = f"{text}{int(now * 1000) % 1000:03d}"
+        return f"ALERT-{time_prefix}-{self.worker}-{next(self._sequence)}"
+
+ALERT_IDS = AlertIdGenerator()
+if hasattr(os, "register_at_fork"): os.register_at_fork(after_in_child=ALERT_IDS.reset)
+
+def _generate_alert_id_chunk(count):
+    # Worker entry point for the alert ID stress test
+    return [ALERT_IDS.next_id() for _ in range(count)]
+
+def stress_alert_ids(total_ids, threads=4, processes=2):
+    """
+    Generate total_ids alert IDs, half from threads sharing this process's
+    generator and half from a process pool. Returns (ids, elapsed_seconds).
+    """
+    thread_share = total_ids // 2 // threads
+    process_share = (total_ids - thread_share * threads) // processes
+    results = []
+    started = time.perf_counter()
+    workers = [threading.Thread(target=lambda: results.append(_generate_alert_id_chunk(thread_share))) for _ in range(threads)]
+    for worker in workers: worker.start()
+    with multiprocessing.Pool(processes) as pool:
+        results.extend(pool.map(_generate_alert_id_chunk, [process_share] * processes))
+    for worker in workers: worker.join()
+    elapsed = time.perf_counter() - started
+    return [alert_id for chunk in results for alert_id in chunk], elapsed
+
+def render_alert_message(alert_id, event_type, severity, affected_systems, details_string, timestamp):
+    severity = severity.upper()
+    return ALERT_MESSAGE_TEMPLATE(icon=SEVERITY_ICONS.get(severity, "⚪️"), severity=severity, alert_id=alert_id,
+                                  event_type=event_type, timestamp=timestamp,
+                                  systems=", ".join(affected_systems), details=details_string)
+
+class SecurityAlert:
+    """
+    An alert from create_security_alert(). formatted_message is rendered the
+    first time it is read and then kept, so alerts that are never shown never
+    pay for formatting. to_dict() gives the plain {"alert_id",
+    "formatted_message"} dict that generate_security_alert() returns.
+    """
+    __slots__ = ("alert_id", "_render_fields", "_message")
+
+    def __init__(self, alert_id, render_fields):
+        self.alert_id = alert_id
+        self._render_fields = render_fields
+        self._message = None
+
+    @property
+    def formatted_message(self):
+        if self._message is None:
+            self._message = render_alert_message(self.alert_id, *self._render_fields)
+            self._render_fields = None
+        return self._message
+
+    def to_dict(self):
+        return {"alert_id": self.alert_id, "formatted_message": self.formatted_message}
+
+    def __repr__(self):
+        return f"SecurityAlert({self.alert_id!r})"
+
+class AlertAggregator:
+    """
+    Time-windowed de-duplication in front of create_security_alert().
+
+    Alerts are keyed on (event type, set of affected systems). The first alert
+    for a key opens a window of `window` seconds; repeats inside the window are
+    counted instead of generated. flush() (or flush_due(), every
+    `summary_interval` seconds) turns those counters into one summary record
+    per key and forgets windows that have closed. The defaults come from
+    ALERT_DEDUP_WINDOW and ALERT_SUMMARY_INTERVAL (see env_settings.py).
+    """
+    def __init__(self, window=None, summary_interval=None, clock=time.monotonic):
+        self.window = alert_dedup_window() if window is None else window
+        self.summary_interval = alert_summary_interval() if summary_interval is None else summary_interval
+        self.clock = clock
+        self.emitted = 0
+        self.suppressed = 0
+        self._windows = {} # key -> [window_opened_at, suppressed_since_flush, alert_id]
+        self._closed = [] # Summaries of windows that rolled over before being flushed
+        self._last_flush = clock()
+
+    def submit(self, event_type, severity, affected_systems_list, details_string):
+        """Return a new SecurityAlert (see create_security_alert), or None if an identical one is inside its window."""
+        key = (event_type, frozenset(affected_systems_list))
+        now = self.clock()
+        entry = self._windows.get(key)
+        if entry is not None and now - entry[0] < self.window:
+            entry[1] += 1
+            self.suppressed += 1
+            return None
+        alert = create_security_alert(event_type, severity, affected_systems_list, details_string)
+        if entry is not None and entry[1]: # Window closed with unreported repeats; keep them for the next flush
+            self._closed.append(self._summary(key, entry))
+        self._windows[key] = [now, 0, alert.alert_id]
+        self.emitted += 1
+        return alert
+
+    def flush(self):
+        """Return summaries of suppressed repeats since the last flush and drop closed windows."""
+        now = self.clock()
+        summaries, self._closed = self._closed, []
+        for key, entry in list(self._windows.items()):
+            if entry[1]:
+                summaries.append(self._summary(key, entry))
+                entry[1] = 0
+            if now - entry[0] >= self.window: del self._windows[key]
+        self._last_flush = now
+        return summaries
+
+    @staticmethod
+    def _summary(key, entry):
+        return {"event_type": key[0], "affected_systems": sorted(key[1]),
+                "suppressed": entry[1], "first_alert_id": entry[2]}
+
+    def flush_due(self):
+        """flush() if summary_interval has elapsed since the last flush, else []."""
+        return self.flush() if self.clock() - self._last_flush >= self.summary_interval else []
+
+    def stats(self):
+        return {"emitted": self.emitted, "suppressed": self.suppressed, "open_windows": len(self._windows)}
+
+_shared_aggregator = None
+
+def shared_alert_aggregator():
+    """
+    The module-level AlertAggregator for callers that want repeats suppressed
+    across calls, or None unless ALERT_DEDUP_WINDOW is set (the opt-in).
+    """
+    global _shared_aggregator
+    window = alert_dedup_window(None)
+    if window is None: return None
+    if _shared_aggregator is None or _shared_aggregator.window != window:
+        _shared_aggregator = AlertAggregator(window)
+    return _shared_aggregator
+
+def _generate_security_alert_reference(event_type, severity, affected_systems_list, details_string):
+    # Original eager implementation, kept as the benchmark baseline
+    # from datetime import datetime # Moved to top
+    now = datetime.now()
+    alert_id = f"ALERT-{now.strftime('%Y%m%d-%H%M%S%f')[:-3]}" # Added microseconds for uniqueness
+    severity_icons = {"LOW": "🟢", "MEDIUM": "🟡", "HIGH": "🟠", "CRITICAL": "🔴"}
+    icon = severity_icons.get(severity.upper(), "⚪️")
+
+    formatted_message_lines = [
+        f"\n{'='*60}",
+        f"{icon} SECURITY ALERT - {severity.upper()} SEVERITY",
+        f"{'='*60}",
+        f"Alert ID: {alert_id}",
+        f"Event Type: {event_type}",
+        f"Timestamp: {now.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Affected Systems: {', '.join(affected_systems_list)}",
+        f"Details: {details_string}",
+        f"{'='*60}"
+    ]
+    formatted_message = "\n".join(formatted_message_lines)
+    # The problem asks this function to print, but for better testability,
+    # the printing will be handled by run_security_assessment.
+    # This function will return the data needed for printing.
+    return {"alert_id": alert_id, "formatted_message": formatted_message}
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python security_alerts.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+def benchmark_alert_generation(alert_count=None):
+    """Alerts/sec for the original eager generator and the templated, lazily rendered one."""
+    alert_count = alert_count or int(200_000 * benchmark_scale())
+    systems = ["web-01", "db-01", "fw-01"]
+    runs = (("original (eager)", lambda: _generate_security_alert_reference("Brute Force", "HIGH", systems, "Repeated failures")),
+            ("templated dict", lambda: generate_security_alert("Brute Force", "HIGH", systems, "Repeated failures")),
+            ("lazy, not rendered", lambda: create_security_alert("Brute Force", "HIGH", systems, "Repeated failures")),
+            ("lazy, rendered", lambda: create_security_alert("Brute Force", "HIGH", systems, "Repeated failures").formatted_message))
+    for label, make_alert in runs:
+        started = time.perf_counter()
+        for _ in range(alert_count): make_alert()
+        elapsed = time.perf_counter() - started
+        print(f"  {label:<24} {alert_count / elapsed:12,.0f} alerts/sec")
+
+def benchmark_alert_aggregation(event_count=None):
+    """Alerts printed with and without the dedup window for a repetitive alert stream."""
+    event_count = event_count or int(100_000 * benchmark_scale())
+    rng = random.Random(7)
+    hosts = [f"10.0.0.{i}" for i in range(1, 21)]
+    events = [(rng.choice(("Open Ports Discovered", "Weak Password(s) Detected", "High Severity Log Event")),
+               "MEDIUM", [rng.choice(hosts)], "benchmark") for _ in range(event_count)]
+    sink = io.StringIO()
+    started = time.perf_counter()
+    for event in events: sink.write(generate_security_alert(*event)["formatted_message"])
+    plain_elapsed, plain_bytes = time.perf_counter() - started, sink.tell()
+    clock = itertools.count(0, 0.036).__next__ # Stream spread over one simulated hour
+    aggregator, sink = AlertAggregator(window=600, summary_interval=300, clock=clock), io.StringIO()
+    started = time.perf_counter()
+    for event in events:
+        alert = aggregator.submit(*event)
+        if alert is not None: sink.write(alert.formatted_message)
+        for summary in aggregator.flush_due(): sink.write(f"{summary}\n")
+    for summary in aggregator.flush(): sink.write(f"{summary}\n")
+    dedup_elapsed = time.perf_counter() - started
+    print(f"  no dedup      {event_count:>9,} alerts {plain_bytes / 1e6:8.2f} MB written in {plain_elapsed:.2f}s")
+    print(f"  10 min window {aggregator.emitted:>9,} alerts {sink.tell() / 1e6:8.2f} MB written in {dedup_elapsed:.2f}s "
+          f"({aggregator.suppressed:,} suppressed)")
+
+def benchmark_alert_ids(total_ids=None):
+    """Throughput and uniqueness of AlertIdGenerator across threads and processes."""
+    total_ids = total_ids or int(2_000_000 * benchmark_scale())
+    ids, elapsed = stress_alert_ids(total_ids)
+    unique = len(set(ids))
+    print(f"  {len(ids):,} IDs from 4 threads + 2 processes in {elapsed:.2f}s  "
+          f"({len(ids) / elapsed:,.0f} IDs/sec), {len(ids) - unique} duplicates")
+    assert unique == len(ids), "duplicate alert IDs generated"
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: generate_security_alert")
+    print("="*50)
+    benchmark_alert_generation()
+    print("\nBENCHMARK: alert de-duplication")
+    benchmark_alert_aggregation()
+    print("\nBENCHMARK: alert ID generation")
+    benchmark_alert_ids()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_security_alerts():
+    all_passed = True
+    try:
+        systems = ["web-01", "db-01"]
+        alert = create_security_alert("Port Scan", "critical", systems, "Sequential SYNs")
+        assert alert._message is None, "message should not be rendered up front"
+        systems.append("late-addition") # Rendering must use the systems as they were at creation
+        expected = _generate_security_alert_reference("Port Scan", "critical", ["web-01", "db-01"], "Sequential SYNs")
+        message = alert.formatted_message
+        assert message.replace(alert.alert_id, "ID").split("Timestamp:")[0] == \
+            expected["formatted_message"].replace(expected["alert_id"], "ID").split("Timestamp:")[0]
+        assert message.splitlines()[-3:] == expected["formatted_message"].splitlines()[-3:]
+        assert alert.formatted_message is message and alert.to_dict() == {"alert_id": alert.alert_id, "formatted_message": message}
+        assert re.fullmatch(r"ALERT-\d{8}-\d{9}-\d+-\d+", alert.alert_id), alert.alert_id
+        plain = generate_security_alert("Port Scan", "LOW", [], "none")
+        assert type(plain) is dict and json.loads(json.dumps(plain)) == plain
+        rendered = _generate_security_alert_reference("X", "LOW", [], "y")["formatted_message"].split("Alert ID")[0]
+        assert plain["formatted_message"].replace("Port Scan", "X").replace("none", "y").startswith(rendered)
+        print("✅ Security Alerts Test 1 (templated lazy alerts): PASSED")
+    except AssertionError as e:
+        print(f"❌ Security Alerts Test 1 (templated lazy alerts): FAILED - {e}")
+        all_passed = False
+
+    try:
+        ids, _ = stress_alert_ids(80_000)
+        assert len(ids) == 80_000 and len(set(ids)) == len(ids), "duplicate alert IDs"
+        same_ms = [ALERT_IDS.next_id("20240101-000000000") for _ in range(1000)]
+        assert len(set(same_ms)) == 1000, "IDs collide within one millisecond"
+        sequences = [int(alert_id.rsplit("-", 1)[1]) for alert_id in same_ms]
+        assert sequences == sorted(sequences), "sequence is not monotonic"
+        print("✅ Security Alerts Test 2 (alert ID uniqueness): PASSED")
+    except (AssertionError, OSError) as e:
+        print(f"❌ Security Alerts Test 2 (alert ID uniqueness): FAILED - {e}")
+        all_passed = False
+
+    try:
+        now = [0.0]
+        aggregator = AlertAggregator(window=60, summary_interval=30, clock=lambda: now[0])
+        first = aggregator.submit("Open Ports Discovered", "MEDIUM", ["10.0.0.1", "10.0.0.2"], "x")
+        assert first is not None
+        assert aggregator.submit("Open Ports Discovered", "MEDIUM", ["10.0.0.2", "10.0.0.1"], "x") is None
+        assert aggregator.submit("Open Ports Discovered", "MEDIUM", ["10.0.0.3"], "x") is not None, "different systems must not be merged"
+        assert aggregator.flush_due() == [], "flush should wait for summary_interval"
+        now[0] = 31
+        assert aggregator.submit("Open Ports Discovered", "MEDIUM", ["10.0.0.1", "10.0.0.2"], "x") is None
+        summaries = aggregator.flush_due()
+        assert summaries == [{"event_type": "Open Ports Discovered", "affected_systems": ["10.0.0.1", "10.0.0.2"],
+                              "suppressed": 2, "first_alert_id": first.alert_id}], summaries
+        now[0] = 45
+        aggregator.submit("Open Ports Discovered", "MEDIUM", ["10.0.0.1", "10.0.0.2"], "x")
+        now[0] = 61 # Window closes: the next repeat is a fresh alert and the leftover repeat is still reported
+        assert aggregator.submit("Open Ports Discovered", "MEDIUM", ["10.0.0.1", "10.0.0.2"], "x") is not None
+        assert [entry["suppressed"] for entry in aggregator.flush()] == [1]
+        assert aggregator.stats() == {"emitted": 3, "suppressed": 3, "open_windows": 1}, aggregator.stats()
+        saved_window = os.environ.pop("ALERT_DEDUP_WINDOW", None)
+        try:
+            assert shared_alert_aggregator() is None, "cross-call de-duplication should be opt-in"
+            os.environ["ALERT_DEDUP_WINDOW"] = "120"
+            shared = shared_alert_aggregator()
+            assert shared is shared_alert_aggregator() and shared.window == 120, "not one module-level aggregator"
+        finally:
+            if saved_window is None: os.environ.pop("ALERT_DEDUP_WINDOW", None)
+            else: os.environ["ALERT_DEDUP_WINDOW"] = saved_window
+        print("✅ Security Alerts Test 3 (alert de-duplication): PASSED")
+    except (AssertionError, KeyError) as e:
+        print(f"❌ Security Alerts Test 3 (alert de-duplication): FAILED - {e}")
+        all_passed = False
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_security_alerts()
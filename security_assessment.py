@@ -0,0 +1,260 @@
+"""
+====================================================================
+SECURITY ASSESSMENT ⏱️ - Concurrent stages and instrumentation
+====================================================================
+
+Shared helper for Module 7 (INTEGRATION: Security Assessment Script).
+
+The password, scan and log stages of an assessment do not depend on each
+other. run_assessment_stages() runs CPU-bound stages in a process pool and
+I/O-bound ones in a thread pool at the same time, and
+AssessmentInstrumentation times each section of the report, counts what was
+processed and can capture cProfile and tracemalloc data.
+
+Run `python security_assessment.py` for the built-in checks and
+`python security_assessment.py --benchmark` for sequential vs parallel timings.
+"""
+
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+from env_settings import benchmark_scale
+from network_scanner import scan_network_range
+from password_audit import analyze_password, generate_benchmark_passwords
+from security_events import BENCHMARK_LOG_LINES, parse_security_events_columnar
+from worker_pools import fork_process_executor, process_pool_usable
+
+def password_analysis_stage(passwords):
+    return [analyze_password(pwd) for pwd in passwords]
+
+def network_scan_stage(network_base, start_host, end_host, target_port):
+    return scan_network_range(network_base, start_host, end_host, target_port=target_port)
+
+def log_analysis_stage(log_lines):
+    # Columns (a few arrays and one string) are far cheaper to send back from a
+    # worker process than one dict per event. Also returns the UTF-8 size of
+    # the lines parsed, for the assessment's counters.
+    columns = parse_security_events_columnar(log_lines)
+    columns.description_text # Join the description parts before pickling
+    return columns, sum(len(line.encode("utf-8")) if isinstance(line, str) else len(line) for line in log_lines)
+
+def _timed_stage(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+def run_assessment_stages(stages, parallel=True):
+    """
+    Run independent (name, executor, function, args) stages and return
+    {name: (result, wall_seconds)}. In parallel mode "process" stages go to a
+    process pool and "thread" stages to a thread pool, all at once, so the
+    total time is that of the slowest stage rather than the sum. Process
+    stages use threads too where workers cannot be forked (see
+    worker_pools.py), and if the process pool breaks only the stages that had
+    not finished are rerun, sequentially in this process.
+    """
+    if not parallel:
+        return {name: _timed_stage(function, *args) for name, _, function, args in stages}
+    process_stages = [stage for stage in stages if stage[1] == "process"]
+    futures = {}
+    results = {}
+    with contextlib.ExitStack() as pools:
+        # The process pool is started before any threads so workers fork from a single-threaded parent
+        processes = fork_process_executor(len(process_stages)) if process_stages else None
+        if processes is not None:
+            pools.enter_context(processes)
+            for name, _, function, args in process_stages:
+                futures[name] = processes.submit(_timed_stage, function, *args)
+        thread_stages = [stage for stage in stages if stage[0] not in futures]
+        threads = pools.enter_context(concurrent.futures.ThreadPoolExecutor(max(1, len(thread_stages))))
+        for name, _, function, args in thread_stages:
+            futures[name] = threads.submit(_timed_stage, function, *args)
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except concurrent.futures.process.BrokenProcessPool:
+                pass # Rerun below; stages that completed before the pool broke keep their results
+    for name, _, function, args in stages:
+        if name not in results: results[name] = _timed_stage(function, *args)
+    return {name: results[name] for name, *_ in stages}
+
+# Comma-separated extras for run_security_assessment(): "cprofile" and/or "tracemalloc"
+ASSESSMENT_PROFILE = os.environ.get("ASSESSMENT_PROFILE", "")
+# If set, run_security_assessment() also writes its timing report (JSON) to this path
+ASSESSMENT_TIMING_REPORT = os.environ.get("ASSESSMENT_TIMING_REPORT", "")
+
+class AssessmentInstrumentation:
+    """
+    Section timings, counters and optional cProfile/tracemalloc capture for
+    run_security_assessment(). report() returns a JSON-serializable dict.
+    """
+    def __init__(self, profile=ASSESSMENT_PROFILE):
+        modes = {mode.strip().lower() for mode in profile.split(",") if mode.strip()}
+        self.profiler = cProfile.Profile() if "cprofile" in modes else None
+        self.trace_memory = "tracemalloc" in modes
+        self.sections = {}
+        self.counters = collections.Counter()
+        self._started_tracing = False
+        self._started = None
+        self._elapsed = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profiler: self.profiler.enable()
+
+    def stop(self):
+        if self._started is None: return # Never started (or already stopped)
+        if self.profiler: self.profiler.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._elapsed = time.perf_counter() - self._started
+        self._started = None
+
+    @contextlib.contextmanager
+    def section(self, name, work_seconds=None):
+        """
+        Time the enclosed block (and its peak traced memory, if tracemalloc is
+        on). When the section's work ran earlier, e.g. as a stage of
+        run_assessment_stages(), pass its time as `work_seconds`: it is recorded
+        as "seconds" and the block itself as "output_seconds".
+        """
+        if self.trace_memory: tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            block_seconds = round(time.perf_counter() - started, 6)
+            entry = ({"seconds": block_seconds} if work_seconds is None
+                     else {"seconds": round(work_seconds, 6), "output_seconds": block_seconds})
+            if self.trace_memory: entry["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            self.sections[name] = entry
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def report(self, top_functions=15):
+        # top_functions=None lists every profiled function
+        report = {"total_seconds": round(self._elapsed, 6), "sections": self.sections, "counters": dict(self.counters)}
+        if self.profiler:
+            stats = pstats.Stats(self.profiler).stats
+            slowest = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top_functions]
+            report["profile"] = [{"function": f"{filename}:{line}({function})", "calls": calls,
+                                  "own_seconds": round(own, 6), "cumulative_seconds": round(cumulative, 6)}
+                                 for (filename, line, function), (_, calls, own, cumulative, _) in slowest]
+        return report
+
+def _sleep_stage(seconds):
+    time.sleep(seconds) # Stands in for a stage waiting on I/O or a remote host
+    return seconds
+
+def _exit_in_worker_stage(parent_pid, delay=0):
+    if os.getpid() != parent_pid:
+        time.sleep(delay)
+        os._exit(1) # Simulates a worker killed mid-stage
+    return "ran in parent"
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python security_assessment.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+def benchmark_assessment_stages(password_count=None, log_line_count=None, scan_latency=0.5):
+    """
+    End-to-end wall time of assessment-sized stages run sequentially vs
+    concurrently. The scan stage is modelled as scan_latency seconds of waiting
+    (a sweep bounded by connect timeouts), since local probes return instantly.
+    """
+    password_count = password_count or int(100_000 * benchmark_scale())
+    log_line_count = log_line_count or int(200_000 * benchmark_scale())
+    log_lines = BENCHMARK_LOG_LINES * (log_line_count // len(BENCHMARK_LOG_LINES))
+    stages = (("passwords", "process", password_analysis_stage, (generate_benchmark_passwords(password_count),)),
+              ("network_scan", "thread", _sleep_stage, (scan_latency,)),
+              ("log_analysis", "process", log_analysis_stage, (log_lines,)))
+    print(f"  {password_count:,} passwords, {len(log_lines):,} log lines, {scan_latency}s scan, {os.cpu_count()} CPU(s)")
+    for parallel in (False, True):
+        started = time.perf_counter()
+        timings = run_assessment_stages(stages, parallel)
+        elapsed = time.perf_counter() - started
+        stage_text = ", ".join(f"{name} {seconds:.3f}s" for name, (_, seconds) in timings.items())
+        print(f"  {'parallel' if parallel else 'sequential':<10} total {elapsed:.3f}s  ({stage_text})")
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: assessment stage scheduler")
+    print("="*50)
+    benchmark_assessment_stages()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_security_assessment():
+    all_passed = True
+    try:
+        sleepy = (("a", "thread", _sleep_stage, (0.3,)), ("b", "thread", _sleep_stage, (0.3,)), ("c", "process", _sleep_stage, (0.3,)))
+        started = time.perf_counter()
+        results = run_assessment_stages(sleepy)
+        assert time.perf_counter() - started < 0.8, "stages did not overlap"
+        assert list(results) == ["a", "b", "c"] and all(result == 0.3 for result, _ in results.values())
+        cpu_stages = (("passwords", "process", password_analysis_stage, (["password", "SecurePass123!"],)),
+                      ("log_analysis", "process", log_analysis_stage, (BENCHMARK_LOG_LINES,)))
+        parallel = {name: result for name, (result, _) in run_assessment_stages(cpu_stages).items()}
+        sequential = {name: result for name, (result, _) in run_assessment_stages(cpu_stages, parallel=False).items()}
+        assert parallel["passwords"] == sequential["passwords"], "parallel stages changed the results"
+        assert vars(parallel["log_analysis"][0]) == vars(sequential["log_analysis"][0]), "parallel stages changed the results"
+        assert parallel["log_analysis"][1] == sequential["log_analysis"][1] == sum(len(line) for line in BENCHMARK_LOG_LINES)
+        crashing = (("crash", "process", _exit_in_worker_stage, (os.getpid(), 0.5)), ("pid", "process", os.getpid, ()),
+                    ("a", "thread", _sleep_stage, (0.01,)))
+        results = run_assessment_stages(crashing)
+        assert results["crash"][0] == "ran in parent" and results["a"][0] == 0.01, "broken pool not retried sequentially"
+        if process_pool_usable():
+            assert results["pid"][0] != os.getpid(), "a stage that finished before the pool broke was rerun"
+        print("✅ Assessment Test 1 (assessment stage scheduler): PASSED")
+    except (AssertionError, OSError) as e:
+        print(f"❌ Assessment Test 1 (assessment stage scheduler): FAILED - {e}")
+        all_passed = False
+
+    try:
+        instrumentation = AssessmentInstrumentation("cprofile,tracemalloc")
+        instrumentation.start()
+        with instrumentation.section("passwords"):
+            password_analysis_stage(generate_benchmark_passwords(200))
+        with instrumentation.section("log_analysis"):
+            log_analysis_stage(BENCHMARK_LOG_LINES)
+        with instrumentation.section("log_report", work_seconds=1.5):
+            pass
+        instrumentation.count("passwords_analyzed", 200)
+        instrumentation.count("passwords_analyzed")
+        instrumentation.stop()
+        instrumentation.stop() # A second stop() is ignored
+        AssessmentInstrumentation("").stop() # As is a stop() without start()
+        report = json.loads(json.dumps(instrumentation.report(top_functions=None)))
+        assert list(report["sections"]) == ["passwords", "log_analysis", "log_report"], report["sections"]
+        assert report["sections"]["log_report"]["seconds"] == 1.5 and "output_seconds" in report["sections"]["log_report"]
+        assert all("peak_bytes" in entry for entry in report["sections"].values())
+        assert report["counters"] == {"passwords_analyzed": 201} and report["total_seconds"] > 0
+        assert any("password_analysis_stage" in entry["function"] for entry in report["profile"]), "profile missed the stages"
+        assert not tracemalloc.is_tracing(), "tracemalloc left running"
+        assert "profile" not in AssessmentInstrumentation("").report()
+        print("✅ Assessment Test 2 (assessment instrumentation): PASSED")
+    except (AssertionError, KeyError, TypeError) as e:
+        print(f"❌ Assessment Test 2 (assessment instrumentation): FAILED - {e}")
+        all_passed = False
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_security_assessment()
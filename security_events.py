@@ -0,0 +1,244 @@
+"""
+====================================================================
+SECURITY EVENTS 📜 - Fast log line parsing and columnar ingestion
+====================================================================
+
+Shared helper for Module 7 (TOOL 3: Security Log Processor).
+
+parse_security_event() splits "YYYY-MM-DD HH:MM:SS SEVERITY description"
+lines with one str.split() and a single dict lookup for the severity, and
+falls back to the general parser only for non-ASCII input.
+parse_security_events_columnar() ingests millions of lines into a few
+arrays and one string (SecurityEventColumns) instead of one dict per event.
+
+Run `python security_events.py` for the built-in checks and
+`python security_events.py --benchmark` for lines/sec and memory numbers.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+
+from env_settings import benchmark_scale
+
+EVENT_SEVERITIES = ("INFO", "WARNING", "ERROR", "CRITICAL")
+# Every severity starts with a different letter, so one lookup finds the only candidate
+_SEVERITY_BY_INITIAL = {sev[0]: sev for sev in EVENT_SEVERITIES}
+
+def _split_security_event(log_line_string):
+    # Fast path for ASCII lines: one split, one dict lookup and one upper() of
+    # at most 8 characters. Returns (timestamp, severity, description); shared
+    # by parse_security_event() and parse_security_events_columnar().
+    if type(log_line_string) is not str or not log_line_string.isascii():
+        event = _parse_security_event_reference(log_line_string)
+        return event["timestamp"], event["severity"], event["description"]
+    parts = log_line_string.split(" ", 2)
+    if len(parts) < 3:
+        severity = _SEVERITY_BY_INITIAL.get(log_line_string[:1].upper())
+        if severity is None or log_line_string[:len(severity)].upper() != severity: severity = "ERROR"
+        return "Unknown", severity, "Malformed log entry: " + log_line_string
+    remaining = parts[2]
+    severity = _SEVERITY_BY_INITIAL.get(remaining[:1].upper())
+    if severity is not None:
+        n = len(severity)
+        if remaining[:n].upper() == severity and (len(remaining) == n or remaining[n].isspace()):
+            return parts[0] + " " + parts[1], severity, remaining[n:].lstrip()
+    return parts[0] + " " + parts[1], "UNKNOWN", remaining
+
+def parse_security_event(log_line_string):
+    # Output is identical to _parse_security_event_reference (see _split_security_event)
+    timestamp, severity, description = _split_security_event(log_line_string)
+    return {"timestamp": timestamp, "severity": severity, "description": description}
+
+# One dict per event is heavy for millions of lines. The columnar form keeps a
+# list of (shared) timestamp strings, one byte per severity code, and every
+# description packed into a single string addressed by offsets.
+SEVERITY_CODES = {"INFO": 0, "WARNING": 1, "ERROR": 2, "CRITICAL": 3, "UNKNOWN": 4}
+SEVERITY_NAMES = tuple(SEVERITY_CODES)
+
+class SecurityEventColumns:
+    """Columnar parse_security_event() results; see parse_security_events_columnar()."""
+
+    def __init__(self):
+        self.timestamps = []
+        self.severity_codes = array("B")
+        self.description_offsets = array("Q", [0])
+        self._description_parts = []
+        self._description_text = ""
+
+    def __len__(self):
+        return len(self.severity_codes)
+
+    @property
+    def description_text(self):
+        if self._description_parts: # Join lazily, once, after appends
+            self._description_text += "".join(self._description_parts)
+            self._description_parts = []
+        return self._description_text
+
+    def description(self, index):
+        return self.description_text[self.description_offsets[index]:self.description_offsets[index + 1]]
+
+    def event(self, index):
+        """Rebuild the parse_security_event() dict for one row."""
+        return {"timestamp": self.timestamps[index], "severity": SEVERITY_NAMES[self.severity_codes[index]],
+                "description": self.description(index)}
+
+    def severity_counts(self):
+        return {name: self.severity_codes.count(code) for name, code in SEVERITY_CODES.items()}
+
+def parse_security_events_columnar(lines, columns=None):
+    """
+    Parse an iterable of log lines (a list, generator or open file) into a
+    SecurityEventColumns, with the same per-line semantics as parse_security_event().
+    Trailing newlines are ignored. Pass `columns` to keep appending to it.
+    """
+    if columns is None: columns = SecurityEventColumns()
+    split_event = _split_security_event
+    shared_timestamps = {} # Consecutive events usually share a timestamp string
+    add_timestamp = columns.timestamps.append
+    add_code = columns.severity_codes.append
+    add_offset = columns.description_offsets.append
+    add_description = columns._description_parts.append
+    codes = SEVERITY_CODES
+    offset = columns.description_offsets[-1]
+    for line in lines:
+        timestamp, severity, description = split_event(line.rstrip("\r\n") if type(line) is str else line)
+        add_timestamp(shared_timestamps.setdefault(timestamp, timestamp))
+        add_code(codes[severity])
+        add_description(description)
+        offset += len(description)
+        add_offset(offset)
+    return columns
+
+def _parse_security_event_reference(log_line_string):
+    # General implementation: handles any input, including non-ASCII text where
+    # upper() can change string length. The fast path defers to it for those.
+    try:
+        parts = log_line_string.split(" ", 2)
+        if len(parts) < 3:
+            # Attempt to find severity if it's a single word log_line_string
+            possible_severities = ["INFO", "WARNING", "ERROR", "CRITICAL"]
+            severity_found = "UNKNOWN"
+            for sev in possible_severities:
+                if log_line_string.upper().startswith(sev):
+                    severity_found = sev
+                    break
+            return {"timestamp": "Unknown", "severity": severity_found if severity_found != "UNKNOWN" else "ERROR", "description": f"Malformed log entry: {log_line_string}"}
+
+        timestamp = f"{parts[0]} {parts[1]}"
+
+        # More robust severity parsing
+        remaining_part = parts[2]
+        severity = "UNKNOWN" # Default
+        description = remaining_part
+
+        # Check common severity keywords at the start of the remaining part
+        # Case-insensitive check for severity
+        possible_severities = ["INFO", "WARNING", "ERROR", "CRITICAL"]
+        for sev_keyword in possible_severities:
+            if remaining_part.upper().startswith(sev_keyword):
+                # Check if the keyword is followed by a space or is the whole remaining string
+                if len(remaining_part) == len(sev_keyword) or (len(remaining_part) > len(sev_keyword) and remaining_part[len(sev_keyword)].isspace()):
+                    severity = sev_keyword
+                    description = remaining_part[len(sev_keyword):].lstrip()
+                    break
+
+        return {"timestamp": timestamp, "severity": severity, "description": description}
+    except Exception: # Catch any other parsing error
+        return {"timestamp": "Unknown", "severity": "ERROR", "description": f"Malformed log entry: {log_line_string}"}
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python security_events.py --benchmark)
+# ============================================================================
+# Sizes can be scaled with the BENCHMARK_SCALE environment variable (default 1).
+
+PARSE_EVENT_TARGET_LINES_PER_SEC = int(os.environ.get("PARSE_EVENT_TARGET_LINES_PER_SEC", "200000"))
+BENCHMARK_LOG_LINES = [
+    "2023-10-01 14:30:15 INFO User login successful",
+    "2023-10-01 14:35:22 WARNING Multiple failed login attempts",
+    "2023-10-01 14:36:01 error Database connection lost",
+    "2023-10-01 14:40:00 CRITICAL Ransomware signature detected on fs-02",
+    "2023-10-01 14:41:12 NOTICE Configuration reloaded",
+    "Malformed log",
+]
+
+def benchmark_parse_security_event(line_count=None):
+    """Lines/sec for the original parser and the fast path, checked against a target rate."""
+    line_count = line_count or int(600_000 * benchmark_scale())
+    lines = (BENCHMARK_LOG_LINES * (line_count // len(BENCHMARK_LOG_LINES) + 1))[:line_count]
+    rates = {}
+    for label, parser in (("original", _parse_security_event_reference), ("fast path", parse_security_event)):
+        started = time.perf_counter()
+        for line in lines: parser(line)
+        rates[label] = line_count / (time.perf_counter() - started)
+        print(f"  {label:<10} {rates[label]:12,.0f} lines/sec")
+    status = "✅" if rates["fast path"] >= PARSE_EVENT_TARGET_LINES_PER_SEC else "❌"
+    print(f"  {status} target {PARSE_EVENT_TARGET_LINES_PER_SEC:,} lines/sec "
+          f"(speed-up {rates['fast path'] / rates['original']:.2f}x)")
+    return rates
+
+def benchmark_columnar_ingestion(line_count=None):
+    """Time and peak memory: a list of parse_security_event() dicts vs SecurityEventColumns."""
+    line_count = line_count or int(600_000 * benchmark_scale())
+    lines = (BENCHMARK_LOG_LINES * (line_count // len(BENCHMARK_LOG_LINES) + 1))[:line_count]
+    for label, ingest in (("list of dicts", lambda: [parse_security_event(line) for line in lines]),
+                          ("columns", lambda: parse_security_events_columnar(lines))):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = ingest()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del result
+        print(f"  {label:<14} {elapsed:6.2f}s (traced)  peak {peak / 1e6:8.1f} MB for {line_count:,} lines")
+
+def run_benchmarks():
+    print("\n" + "="*50)
+    print("BENCHMARK: parse_security_event")
+    print("="*50)
+    benchmark_parse_security_event()
+    print("\nBENCHMARK: columnar log ingestion")
+    benchmark_columnar_ingestion()
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_security_events():
+    all_passed = True
+    try:
+        samples = BENCHMARK_LOG_LINES + [
+            "", " ", "INFO", "info only", "Warning!", "CRITICALLY bad", "2023-10-01 14:30:15 INFORMATION leak",
+            "2023-10-01 14:30:15 info\tlower case with tab", "2023-10-01 14:30:15 ERROR", "2023-10-01 14:30:15 ",
+            "2023-10-01 14:30:15 warning\x1cseparator", "2023-10-01  14:30:15 INFO double space",
+            "2023-10-01 14:30:15 ınfo dotless i", "2023-10-01 14:30:15 CRITICAL Überwachung failed",
+            "ERROR: disk", None, 42,
+        ]
+        for line in samples:
+            assert parse_security_event(line) == _parse_security_event_reference(line), f"mismatch for {line!r}"
+        print("✅ Security Events Test 1 (parse_security_event fast path): PASSED")
+    except AssertionError as e:
+        print(f"❌ Security Events Test 1 (parse_security_event fast path): FAILED - {e}")
+        all_passed = False
+
+    try:
+        lines = [line + "\n" for line in BENCHMARK_LOG_LINES] + ["2023-10-01 14:30:15 ınfo dotless i"]
+        columns = parse_security_events_columnar(iter(lines))
+        assert len(columns) == len(lines)
+        assert [columns.event(i) for i in range(len(columns))] == [parse_security_event(l.rstrip("\n")) for l in lines]
+        counts = columns.severity_counts()
+        assert counts["INFO"] == 2 and counts["ERROR"] == 2 and counts["UNKNOWN"] == 1, counts
+        assert columns.severity_codes.itemsize == 1
+        print("✅ Security Events Test 2 (columnar log ingestion): PASSED")
+    except AssertionError as e:
+        print(f"❌ Security Events Test 2 (columnar log ingestion): FAILED - {e}")
+        all_passed = False
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_security_events()
@@ -0,0 +1,877 @@
+"""
+====================================================================
+SECURITY FILES 🗂️ - Streaming user, alert, config and metrics files
+====================================================================
+
+Shared helper for Module 8 (TOOLS 1-5 of the Security File Management
+System).
+
+Every tool here streams its input instead of reading it whole: the user CSV
+goes through csv.reader with optional counting, sampling or spilling to
+disk; HIGH/CRITICAL alerts are written in large batches, optionally
+atomically and from several sensor files merged by timestamp; the config is
+rewritten into a locked, fsynced temporary file that replaces the original;
+rotated logs are archived straight from their gzip, bz2 or xz form.
+Counts from each full pass are cached so a metrics report does not re-read
+files the other tools have already seen.
+
+Run `python security_files.py` for the built-in checks and
+`python security_files.py --benchmark` for throughput and memory numbers
+(LOG_BENCHMARK_MB scales the inputs, default 256).
+"""
+
+import contextlib
+import csv
+import gzip
+import hashlib
+import heapq
+import lzma
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime
+
+from env_settings import log_benchmark_mb
+from log_scanner import COMPRESSED_LOG_EXTENSIONS, detect_compression, open_log_file
+from stream_sampling import StreamSample
+from worker_pools import imap_in_processes
+
+try:
+    import fcntl # Optional: advisory locking in update_security_config() (POSIX only)
+except ImportError:
+    fcntl = None
+
+# Every full pass over an input file (the user CSV or an alerts file) records
+# its counts here, keyed on the file's absolute path, size and mtime. A metrics
+# report over files that the tools below have already scanned, or that an
+# earlier report scanned, reuses those counts instead of reading the files again.
+INPUT_METRICS_CACHE_SIZE = 64
+_input_metrics_cache = OrderedDict()
+
+def _input_signature(filepath):
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return (os.path.abspath(filepath), st.st_size, st.st_mtime_ns)
+
+def cached_input_metrics(kind, filepath):
+    """Counts from an earlier full pass of kind "users" or "alerts" over this unchanged file, or None."""
+    signature = _input_signature(filepath)
+    metrics = _input_metrics_cache.get((kind, signature)) if signature else None
+    if metrics is None: return None
+    _input_metrics_cache.move_to_end((kind, signature))
+    return dict(metrics)
+
+def _store_input_metrics(kind, signature, metrics):
+    # `signature` is taken before the scan: a file changed mid-scan gets a new mtime and never matches it
+    if signature is None: return
+    _input_metrics_cache[(kind, signature)] = dict(metrics)
+    _input_metrics_cache.move_to_end((kind, signature))
+    while len(_input_metrics_cache) > INPUT_METRICS_CACHE_SIZE: _input_metrics_cache.popitem(last=False)
+
+def clear_input_metrics_cache():
+    _input_metrics_cache.clear()
+
+# TOOL 1: User Account Data Processor
+# The CSV is streamed with csv.reader over a large read buffer, so only the
+# current row is ever in memory. What is kept per user depends on `mode`:
+# "lists" keeps every username (the TOOL 1 result), "count" keeps only the
+# totals and "sample" keeps a uniform random sample of up to `sample_size`
+# usernames per list. With `spill_directory`, "lists" mode writes the
+# usernames to files there instead of RAM (see SpilledUserList).
+USER_LIST_MODES = ("lists", "count", "sample")
+USER_LIST_KEYS = ("active_users", "inactive_users", "admin_users")
+ADMIN_ROLES = {"admin", "administrator"}
+
+class SpilledUserList:
+    """
+    Usernames spilled to a file, one per line. Supports len(), iteration and
+    `in` without loading the list; call remove() to delete the file.
+    """
+
+    def __init__(self, path, count):
+        self.path = path
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        with open(self.path, "r", newline="") as f:
+            for line in f: yield line[:-1]
+
+    def __contains__(self, username):
+        return any(name == username for name in self)
+
+    def __repr__(self):
+        return f"SpilledUserList({self.path!r}, {self.count})"
+
+    def remove(self):
+        if os.path.exists(self.path): os.remove(self.path)
+
+def _open_user_csv(csv_filepath, read_bytes):
+    opener = detect_compression(csv_filepath)
+    if opener is None: return open(csv_filepath, "r", newline="", buffering=read_bytes)
+    return opener(csv_filepath, "rt", newline="")
+
+def process_user_list(csv_filepath, mode="lists", sample_size=1000, spill_directory=None, read_bytes=1 << 20):
+    """
+    Summarize a user CSV (TOOL 1). Always returns total_users and the
+    active/inactive/admin counts; the username lists are omitted in "count"
+    mode. Returns None if the file cannot be read or is not valid CSV.
+    """
+    if mode not in USER_LIST_MODES: raise ValueError(f"Unknown user list mode: {mode}")
+    signature = _input_signature(csv_filepath)
+    if mode == "count":
+        cached = cached_input_metrics("users", csv_filepath)
+        if cached is not None: return cached
+    spilled, complete = {}, False
+    try:
+        with _open_user_csv(csv_filepath, read_bytes) as csv_file:
+            collectors, add = {}, {}
+            for key in USER_LIST_KEYS:
+                if mode == "sample":
+                    collectors[key] = StreamSample(sample_size, "reservoir", seed=0)
+                    add[key] = collectors[key].add
+                elif mode == "lists" and spill_directory is not None:
+                    handle, path = tempfile.mkstemp(prefix=f"{key}-", suffix=".txt", dir=spill_directory)
+                    spilled[key] = open(handle, "w", buffering=read_bytes)
+                    collectors[key] = path
+                    write = spilled[key].write
+                    add[key] = lambda username, write=write: write(username + "\n")
+                elif mode == "lists":
+                    collectors[key] = []
+                    add[key] = collectors[key].append
+            add_active, add_inactive, add_admin = (add.get(key) for key in USER_LIST_KEYS)
+            total = active = inactive = admin = 0
+            header_checked = False
+            for row in csv.reader(csv_file):
+                if len(row) < 5: # username,role,email,last_login_date,status
+                    if not row: continue # Blank line
+                    return None
+                if not header_checked: # The header, if any, is the first non-blank row
+                    header_checked = True
+                    if row[0].strip().lower() == "username": continue
+                total += 1
+                username, role, status = row[0].strip(), row[1], row[4]
+                if status != "active" and status != "inactive": status = status.strip().lower()
+                if status == "active":
+                    active += 1
+                    if add_active: add_active(username)
+                elif status == "inactive":
+                    inactive += 1
+                    if add_inactive: add_inactive(username)
+                if role == "user": continue # Most common role; skip normalizing it
+                if role.strip().lower() in ADMIN_ROLES:
+                    admin += 1
+                    if add_admin: add_admin(username)
+        complete = True
+    except (OSError, csv.Error, UnicodeDecodeError, EOFError, lzma.LZMAError):
+        return None
+    finally:
+        for spill_file in spilled.values(): spill_file.close()
+        if not complete:
+            for key in spilled: os.remove(collectors[key])
+    summary = {"total_users": total, "active_user_count": active, "inactive_user_count": inactive,
+               "admin_user_count": admin}
+    _store_input_metrics("users", signature, summary)
+    counts = dict(zip(USER_LIST_KEYS, (active, inactive, admin)))
+    for key, collector in collectors.items():
+        if mode == "sample": summary[key] = collector.values()
+        elif key in spilled: summary[key] = SpilledUserList(collector, counts[key])
+        else: summary[key] = collector
+    return summary
+
+# TOOL 2: Security Alert Filtering System
+HIGH_PRIORITY_SEVERITIES = {"HIGH", "CRITICAL"}
+
+def scan_security_alerts(alerts_filepath, report_file=None):
+    """
+    One pass over an alerts file (plain or gzip/bz2/xz) that counts every
+    alert and, when `report_file` is given, writes the HIGH/CRITICAL ones to
+    it. Returns {"total_alerts", "high_priority_alert_count",
+    "critical_alert_count"}; file errors propagate to the caller.
+    """
+    signature = _input_signature(alerts_filepath)
+    with open_log_file(alerts_filepath) as alerts_file:
+        metrics = _scan_alert_lines(alerts_file, None if report_file is None else report_file.write)
+    _store_input_metrics("alerts", signature, metrics)
+    return metrics
+
+def _scan_alert_lines(alerts_file, write):
+    total = high_priority = critical = 0
+    for line in alerts_file:
+        parts = line.split("|", 3)
+        if len(parts) < 4: continue # Skip malformed alert lines
+        total += 1
+        severity = parts[1].strip().upper() # Only HIGH/CRITICAL lines need the other fields
+        if severity in HIGH_PRIORITY_SEVERITIES:
+            high_priority += 1
+            if severity == "CRITICAL": critical += 1
+            if write is not None:
+                write(f"ALERT: {parts[0].strip()} - {severity} - {parts[2].strip()} - {parts[3].strip()}\n")
+    return {"total_alerts": total, "high_priority_alert_count": high_priority, "critical_alert_count": critical}
+
+# Report lines are collected in batches and each batch goes out as one large
+# write to a file with a 1 MB buffer, so millions of alerts cost a few hundred
+# write() system calls instead of one Python-level write (and a flush every
+# 8 KB) per alert. With atomic=True the report is built in "<report>.tmp" and
+# renamed over the target only once it is complete.
+REPORT_BUFFER_BYTES = 1 << 20
+REPORT_BATCH_LINES = 4096
+
+class BufferedReportWriter:
+    """File-like report writer (write/flush/close, usable with `with`) that batches lines."""
+
+    def __init__(self, filepath, buffer_bytes=REPORT_BUFFER_BYTES, batch_lines=REPORT_BATCH_LINES, atomic=False):
+        self.filepath = filepath
+        self.batch_lines = batch_lines
+        self.atomic = atomic
+        self.lines_written = 0
+        self._target = f"{filepath}.tmp" if atomic else filepath
+        self._file = open(self._target, "w", buffering=buffer_bytes)
+        self._batch = []
+
+    def write(self, line):
+        self._batch.append(line)
+        if len(self._batch) >= self.batch_lines: self.flush()
+
+    def writelines(self, lines):
+        for line in lines: self.write(line)
+
+    def flush(self):
+        if self._batch:
+            self._file.write("".join(self._batch)) # One call per batch instead of one per line
+            self.lines_written += len(self._batch)
+            self._batch.clear()
+
+    def close(self):
+        if self._file.closed: return
+        self.flush()
+        self._file.close()
+        if self.atomic: os.replace(self._target, self.filepath)
+
+    def discard(self):
+        """Close without publishing: an atomic report leaves the previous file untouched."""
+        self._batch.clear()
+        self._file.close()
+        if self.atomic and os.path.exists(self._target): os.remove(self._target)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None: self.close()
+        elif self.atomic: self.discard()
+        else: self.close() # Keep what was written, like a plain file would
+        return False
+
+def _filter_alerts_to_report(alerts_filepath, report_filepath, buffer_bytes=REPORT_BUFFER_BYTES, atomic=False):
+    # The alerts file is opened before the report, so a missing or unreadable
+    # input never truncates an existing report
+    signature = _input_signature(alerts_filepath)
+    with open_log_file(alerts_filepath) as alerts_file, \
+         BufferedReportWriter(report_filepath, buffer_bytes, atomic=atomic) as report_file:
+        metrics = _scan_alert_lines(alerts_file, report_file.write)
+    _store_input_metrics("alerts", signature, metrics)
+    return metrics
+
+def process_security_alerts(alerts_filepath, output_report_filepath, buffer_bytes=REPORT_BUFFER_BYTES, atomic=False):
+    # The same pass also records the alert counts for generate_metrics_report()
+    try:
+        metrics = _filter_alerts_to_report(alerts_filepath, output_report_filepath, buffer_bytes, atomic)
+    except (OSError, UnicodeDecodeError, EOFError, lzma.LZMAError):
+        return -1
+    return metrics["high_priority_alert_count"]
+
+# Multi-sensor mode: every alerts file is filtered into its own part file by a
+# process pool, then the parts are k-way merged by timestamp with heapq.merge,
+# which holds one line per input in memory. Each sensor file is expected to be
+# in timestamp order already (the merged report is complete either way, but
+# only globally ordered if the inputs are).
+def _report_line_timestamp(report_line):
+    # "ALERT: <timestamp> - ..." -> "<timestamp>" (ISO 8601 sorts as text)
+    return report_line[7:report_line.find(" - ", 7)]
+
+def _filter_alert_file(task):
+    alerts_filepath, part_filepath = task
+    try:
+        return _filter_alerts_to_report(alerts_filepath, part_filepath)
+    except (OSError, UnicodeDecodeError, EOFError, lzma.LZMAError):
+        return None
+
+def process_security_alerts_many(alerts_filepaths, output_report_filepath, workers=None, atomic=False):
+    """
+    Filter several alerts files (e.g. one per sensor) into one report ordered
+    by timestamp. Returns the total count of HIGH/CRITICAL alerts written, or
+    -1 if any input cannot be read (no report is written in that case).
+    """
+    alerts_filepaths = list(alerts_filepaths)
+    workers = min(workers or os.cpu_count() or 1, max(1, len(alerts_filepaths)))
+    part_directory = None
+    try:
+        part_directory = tempfile.mkdtemp(prefix=".alert_parts_",
+                                          dir=os.path.dirname(os.path.abspath(output_report_filepath)))
+        signatures = [_input_signature(filepath) for filepath in alerts_filepaths]
+        tasks = [(filepath, os.path.join(part_directory, f"{index}.part")) for index, filepath in enumerate(alerts_filepaths)]
+        results = list(imap_in_processes(_filter_alert_file, tasks, workers))
+        if any(result is None for result in results): return -1
+        for signature, metrics in zip(signatures, results): _store_input_metrics("alerts", signature, metrics)
+        with contextlib.ExitStack() as stack:
+            parts = [stack.enter_context(open(part_filepath, "r", buffering=1 << 16)) for _, part_filepath in tasks]
+            report_file = stack.enter_context(BufferedReportWriter(output_report_filepath, atomic=atomic))
+            for line in heapq.merge(*parts, key=_report_line_timestamp): report_file.write(line)
+        return sum(result["high_priority_alert_count"] for result in results)
+    except OSError:
+        return -1
+    finally:
+        if part_directory: shutil.rmtree(part_directory, ignore_errors=True)
+
+# TOOL 3: Configuration Management Tool
+# The config is rewritten line by line into a temporary file next to it (made
+# with tempfile.mkstemp), which is fsynced and renamed over the original, so
+# readers only ever see the old or the new file and memory does not grow with
+# the file. Updates are looked up in a dict per line; keys never seen are
+# appended at the end. Concurrent writers take an exclusive advisory lock on
+# the config itself; because every update replaces the file, a writer that
+# waited re-checks that the path still names the file it locked and otherwise
+# locks the new one, so no update is lost and no lock file is left behind.
+CONFIG_IO_BUFFER_BYTES = 1 << 20
+
+@contextlib.contextmanager
+def _open_locked_config(config_filepath):
+    while True:
+        with open(config_filepath, "r", buffering=CONFIG_IO_BUFFER_BYTES) as config_file:
+            if fcntl is None: # No advisory locks on this platform
+                yield config_file
+                return
+            fcntl.flock(config_file.fileno(), fcntl.LOCK_EX) # Released when the file is closed
+            if os.path.samestat(os.stat(config_filepath), os.fstat(config_file.fileno())):
+                yield config_file
+                return
+        # Another writer replaced the file while we waited: lock the new one
+
+def update_security_config(config_filepath, updates_dict):
+    pending = {str(key).strip(): str(value) for key, value in updates_dict.items()}
+    temp_filepath = None
+    try:
+        with _open_locked_config(config_filepath) as config_file:
+            try:
+                handle, temp_filepath = tempfile.mkstemp(prefix=f".{os.path.basename(config_filepath)}.",
+                                                         suffix=".tmp",
+                                                         dir=os.path.dirname(os.path.abspath(config_filepath)))
+                with open(handle, "w", buffering=CONFIG_IO_BUFFER_BYTES) as temp_file:
+                    applied = {} # Keys already rewritten, so repeated keys get the new value too
+                    ends_with_newline = True
+                    while True:
+                        lines = config_file.readlines(CONFIG_IO_BUFFER_BYTES) # Edited in ~1 MB batches
+                        if not lines: break
+                        for index, line in enumerate(lines):
+                            key, separator, _ = line.partition("=")
+                            if not separator: continue # Comments and blank lines stay as they are
+                            key = key.strip()
+                            if (key in pending or key in applied) and not key.startswith("#"):
+                                if key in pending: applied[key] = pending.pop(key)
+                                lines[index] = f"{key}={applied[key]}\n"
+                        ends_with_newline = lines[-1].endswith("\n") # Checked after the rewrite
+                        temp_file.write("".join(lines))
+                    if pending and not ends_with_newline: temp_file.write("\n")
+                    for key, value in pending.items(): temp_file.write(f"{key}={value}\n")
+                    temp_file.flush()
+                    os.fsync(temp_file.fileno())
+                shutil.copymode(config_filepath, temp_filepath) # mkstemp files start out as 0600
+                os.replace(temp_filepath, config_filepath)
+            finally:
+                if temp_filepath and os.path.exists(temp_filepath): os.remove(temp_filepath)
+    except OSError:
+        return False
+    return True
+
+# TOOL 4: Log Archive System
+# Compressed rotations (e.g. "auth.log.gz") are decompressed on the way in. Each
+# log is read into a staging file first (in memory up to ARCHIVE_STAGING_BYTES)
+# and only copied to the archive once it was read in full, so a log that fails
+# half way (e.g. a truncated .gz) leaves nothing behind in the archive.
+ARCHIVABLE_LOG_EXTENSIONS = (".log", ".txt")
+ARCHIVE_STAGING_BYTES = 16 << 20
+
+def archive_old_logs(source_directory, archive_filepath):
+    if not os.path.isdir(source_directory): return []
+    archived_files = []
+    archive_abspath = os.path.abspath(archive_filepath)
+    try:
+        with open(archive_filepath, "a") as archive_file:
+            for filename in sorted(os.listdir(source_directory)):
+                base_name = filename
+                for extension in COMPRESSED_LOG_EXTENSIONS:
+                    if base_name.endswith(extension): base_name = base_name[:-len(extension)]
+                if not base_name.endswith(ARCHIVABLE_LOG_EXTENSIONS): continue
+                file_path = os.path.join(source_directory, filename)
+                if not os.path.isfile(file_path) or os.path.abspath(file_path) == archive_abspath: continue
+                with tempfile.SpooledTemporaryFile(ARCHIVE_STAGING_BYTES, "w+", encoding="utf-8", newline="") as staged:
+                    ends_with_newline = True
+                    try:
+                        with open_log_file(file_path) as log_file:
+                            for block in iter(lambda: log_file.read(1 << 20), ""):
+                                staged.write(block)
+                                ends_with_newline = block.endswith("\n")
+                    except (OSError, EOFError, UnicodeDecodeError, lzma.LZMAError):
+                        continue # Skip unreadable files and keep archiving the rest
+                    staged.seek(0)
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    archive_file.write(f"--- Start of {filename} (Archived: {timestamp}) ---\n")
+                    shutil.copyfileobj(staged, archive_file, 1 << 20)
+                    if not ends_with_newline: archive_file.write("\n")
+                    archive_file.write(f"--- End of {filename} ---\n")
+                archived_files.append(filename)
+    except OSError:
+        pass # The archive itself failed: report the logs that made it in before that
+    return archived_files
+
+# TOOL 5: Security Metrics Analyzer
+METRICS_REPORT_LABELS = (("total_users", "Total Users"), ("active_user_percentage", "Active User Percentage"),
+                         ("admin_user_count", "Admin Users"), ("total_alerts", "Total Alerts"),
+                         ("high_priority_alert_count", "High Priority Alerts (HIGH/CRITICAL)"),
+                         ("critical_alert_count", "Critical Alerts"))
+
+def generate_metrics_report(user_csv_filepath, alerts_input_filepath, output_metrics_filepath):
+    # Each input is scanned at most once, and not at all if process_user_list(),
+    # process_security_alerts() or an earlier report already saw it unchanged
+    user_metrics = process_user_list(user_csv_filepath, mode="count") # Served from the cache when possible
+    if user_metrics is None: return {}
+    alert_metrics = cached_input_metrics("alerts", alerts_input_filepath)
+    if alert_metrics is None:
+        try:
+            alert_metrics = scan_security_alerts(alerts_input_filepath)
+        except (OSError, UnicodeDecodeError, EOFError, lzma.LZMAError):
+            return {}
+    total_users = user_metrics["total_users"]
+    metrics = {
+        "total_users": total_users,
+        "active_user_percentage": round(100 * user_metrics["active_user_count"] / total_users, 1) if total_users else 0.0,
+        "admin_user_count": user_metrics["admin_user_count"],
+        **alert_metrics,
+    }
+    try:
+        with open(output_metrics_filepath, "w") as report_file:
+            for key, label in METRICS_REPORT_LABELS:
+                report_file.write(f"{label}: {metrics[key]}{'%' if key == 'active_user_percentage' else ''}\n")
+    except OSError:
+        return {}
+    return metrics
+
+
+# ============================================================================
+# PERFORMANCE BENCHMARKS (run with: python security_files.py --benchmark)
+# ============================================================================
+# Input sizes scale with LOG_BENCHMARK_MB (default 256), as in log_scanner.py.
+def generate_benchmark_users(csv_filename, row_count):
+    """Write a synthetic user directory export with `row_count` users."""
+    roles = ("user", "user", "user", "admin", "Administrator", "auditor")
+    with open(csv_filename, "w", newline="") as f:
+        f.write("username,role,email,last_login_date,status\n")
+        for start in range(0, row_count, 10000):
+            f.write("".join(f"user{i},{roles[i % 6]},user{i}@example.com,2023-{i % 12 + 1:02d}-15,"
+                            f"{'inactive' if i % 5 == 0 else 'active'}\n"
+                            for i in range(start, min(start + 10000, row_count))))
+    return os.path.getsize(csv_filename)
+
+def _process_user_list_reference(csv_filepath):
+    # The straightforward approach: read every line into memory, split on commas, keep full lists
+    with open(csv_filepath, "r") as f: lines = f.readlines()
+    summary = {"total_users": 0, "active_users": [], "inactive_users": [], "admin_users": []}
+    for line in lines[1:]:
+        username, role, _, _, status = line.strip().split(",")
+        summary["total_users"] += 1
+        if status == "active": summary["active_users"].append(username)
+        elif status == "inactive": summary["inactive_users"].append(username)
+        if role.lower() in ADMIN_ROLES: summary["admin_users"].append(username)
+    return summary
+
+def benchmark_user_list(row_count=None, csv_filename="benchmark_users.csv"):
+    """Rows/sec and peak traced memory of process_user_list() in each mode."""
+    row_count = row_count or log_benchmark_mb() * 4000
+    file_bytes = generate_benchmark_users(csv_filename, row_count)
+    spill_directory = tempfile.mkdtemp(prefix="benchmark_spill_")
+    print(f"  {row_count:,} rows ({file_bytes / 1e6:.0f} MB)")
+    try:
+        for label, run in (("readlines", lambda: _process_user_list_reference(csv_filename)),
+                           ("lists", lambda: process_user_list(csv_filename)),
+                           ("count", lambda: process_user_list(csv_filename, mode="count")),
+                           ("sample", lambda: process_user_list(csv_filename, mode="sample")),
+                           ("spill", lambda: process_user_list(csv_filename, spill_directory=spill_directory))):
+            started = time.perf_counter()
+            summary = run()
+            elapsed = time.perf_counter() - started
+            del summary
+            tracemalloc.start() # Separate traced run: tracing slows allocation-heavy code down
+            summary = run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert summary["total_users"] == row_count
+            del summary
+            print(f"  {label:<10} {row_count / elapsed:12,.0f} rows/sec  peak {peak / 1e6:8.1f} MB")
+    finally:
+        shutil.rmtree(spill_directory, ignore_errors=True)
+        if os.path.exists(csv_filename): os.remove(csv_filename)
+
+BENCHMARK_ALERT_SEVERITIES = ("LOW", "MEDIUM", "HIGH", "LOW", "CRITICAL", "MEDIUM", "LOW", "HIGH")
+
+def generate_benchmark_alerts(alerts_filename, line_count, sensor="sensor-01", start_second=0):
+    """Write `line_count` pipe-delimited alerts with increasing timestamps, one second apart."""
+    with open(alerts_filename, "w") as f:
+        for start in range(start_second, start_second + line_count, 10000):
+            f.write("".join(f"{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1696118400 + i))}|"
+                            f"{BENCHMARK_ALERT_SEVERITIES[i % 8]}|{sensor}|Synthetic alert {i}\n"
+                            for i in range(start, min(start + 10000, start_second + line_count))))
+    return os.path.getsize(alerts_filename)
+
+def benchmark_metrics_report(row_count=None, csv_filename="benchmark_metrics_users.csv",
+                             alerts_filename="benchmark_metrics_alerts.txt"):
+    """Time a metrics report after the TOOL 1/2 runs, with and without the shared input cache."""
+    row_count = row_count or log_benchmark_mb() * 4000
+    generate_benchmark_users(csv_filename, row_count)
+    generate_benchmark_alerts(alerts_filename, row_count)
+    report_files = ("benchmark_filtered_alerts.txt", "benchmark_metrics_report.txt")
+    try:
+        print(f"  {row_count:,} users and {row_count:,} alerts")
+        for label, clear_between in (("rescan inputs", True), ("cached counts", False)):
+            clear_input_metrics_cache()
+            started = time.perf_counter()
+            process_user_list(csv_filename)
+            process_security_alerts(alerts_filename, report_files[0])
+            tools_seconds = time.perf_counter() - started
+            if clear_between: clear_input_metrics_cache()
+            started = time.perf_counter()
+            generate_metrics_report(csv_filename, alerts_filename, report_files[1])
+            report_seconds = time.perf_counter() - started
+            print(f"  {label:<14} tools {tools_seconds:6.2f}s  + report {report_seconds:8.4f}s")
+        started = time.perf_counter()
+        generate_metrics_report(csv_filename, alerts_filename, report_files[1])
+        print(f"  {'repeat report':<14} {time.perf_counter() - started:27.4f}s (inputs unchanged)")
+    finally:
+        clear_input_metrics_cache()
+        for f_name in (csv_filename, alerts_filename) + report_files:
+            if os.path.exists(f_name): os.remove(f_name)
+
+def _process_security_alerts_reference(alerts_filepath, output_report_filepath):
+    # The original implementation: one formatted write per alert on a default-buffered file
+    high_priority_count = 0
+    with open(alerts_filepath, "r") as alerts_file, open(output_report_filepath, "w") as report_file:
+        for line in alerts_file:
+            parts = line.strip().split("|", 3)
+            if len(parts) < 4: continue
+            timestamp, severity, source, description = (part.strip() for part in parts)
+            if severity.upper() in HIGH_PRIORITY_SEVERITIES:
+                report_file.write(f"ALERT: {timestamp} - {severity.upper()} - {source} - {description}\n")
+                high_priority_count += 1
+    return high_priority_count
+
+def _write_syscalls():
+    # Linux only: write()-family system calls made by this process so far
+    try:
+        with open("/proc/self/io") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("syscw:"))
+    except (OSError, StopIteration):
+        return None
+
+def benchmark_alert_report_writer(line_count=None, alerts_filename="benchmark_report_alerts.txt"):
+    """Wall time and write() system calls of the filtered-report writers."""
+    line_count = line_count or log_benchmark_mb() * 20_000
+    generate_benchmark_alerts(alerts_filename, line_count)
+    report_filename = "benchmark_alert_report.txt"
+    print(f"  {line_count:,} alerts ({os.path.getsize(alerts_filename) / 1e6:.0f} MB)")
+    try:
+        reports = {}
+        for label, run in (("per-line writes", _process_security_alerts_reference),
+                           ("batched", process_security_alerts),
+                           ("batched atomic", lambda src, dst: process_security_alerts(src, dst, atomic=True))):
+            syscalls_before = _write_syscalls()
+            started = time.perf_counter()
+            count = run(alerts_filename, report_filename)
+            elapsed = time.perf_counter() - started
+            syscalls_after = _write_syscalls()
+            syscalls = "n/a" if syscalls_before is None else f"{syscalls_after - syscalls_before:,}"
+            with open(report_filename, "rb") as f: reports[label] = hashlib.sha256(f.read()).hexdigest()
+            print(f"  {label:<16} {elapsed:7.2f}s  {count:,} alerts written  {syscalls:>8} write syscalls")
+        print(f"  identical reports: {len(set(reports.values())) == 1}")
+    finally:
+        for f_name in (alerts_filename, report_filename):
+            if os.path.exists(f_name): os.remove(f_name)
+
+def benchmark_multi_sensor_alerts(line_count=None, sensor_count=8):
+    """Per-file process_security_alerts() loop vs the pooled, timestamp-merged multi-file mode."""
+    line_count = line_count or log_benchmark_mb() * 4000
+    per_sensor = line_count // sensor_count
+    alerts_files = [f"benchmark_sensor_{index}.txt" for index in range(sensor_count)]
+    for index, f_name in enumerate(alerts_files): # Overlapping time ranges, so the merge interleaves them
+        generate_benchmark_alerts(f_name, per_sensor, sensor=f"sensor-{index:02d}", start_second=index * per_sensor // 4)
+    report_filename = "benchmark_merged_report.txt"
+    print(f"  {sensor_count} sensor files x {per_sensor:,} alerts")
+    try:
+        started = time.perf_counter()
+        for index, f_name in enumerate(alerts_files): process_security_alerts(f_name, f"{report_filename}.{index}")
+        print(f"  {'per-file loop':<16} {time.perf_counter() - started:7.2f}s  ({sensor_count} unmerged reports)")
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            started = time.perf_counter()
+            written = process_security_alerts_many(alerts_files, report_filename, workers=workers)
+            print(f"  {f'{workers} worker(s)':<16} {time.perf_counter() - started:7.2f}s  "
+                  f"({written:,} alerts in one merged report)")
+    finally:
+        for f_name in alerts_files + [report_filename] + [f"{report_filename}.{i}" for i in range(sensor_count)]:
+            if os.path.exists(f_name): os.remove(f_name)
+
+def generate_benchmark_config(config_filename, size_mb):
+    """Write a generated key=value config of roughly `size_mb` megabytes with a comment every 100 lines."""
+    block = "".join(f"# section {i // 100}\n" if i % 100 == 0 else f"rule_{{block}}_{i}=allow from 10.0.{i % 256}.0/24\n"
+                    for i in range(10000))
+    with open(config_filename, "w") as f:
+        written, block_number = 0, 0
+        while written < size_mb * 1024 * 1024:
+            written += f.write(block.replace("{block}", str(block_number)))
+            block_number += 1
+    return block_number
+
+def _update_security_config_reference(config_filepath, updates_dict):
+    # The whole-file approach: read every line into a list, edit it, write the list back in place
+    with open(config_filepath, "r") as f: lines = f.readlines()
+    pending = dict(updates_dict)
+    for index, line in enumerate(lines):
+        key, separator, _ = line.partition("=")
+        if separator and key.strip() in pending: lines[index] = f"{key.strip()}={pending.pop(key.strip())}\n"
+    lines.extend(f"{key}={value}\n" for key, value in pending.items())
+    with open(config_filepath, "w") as f: f.writelines(lines)
+    return True
+
+def benchmark_config_update(size_mb=None, config_filename="benchmark_config.ini", update_count=1000):
+    """Wall time and peak traced memory of whole-file vs streaming update_security_config()."""
+    size_mb = size_mb or max(1, log_benchmark_mb() // 2)
+    blocks = generate_benchmark_config(config_filename, size_mb)
+    rng = random.Random(8)
+    updates = {f"rule_{rng.randrange(blocks)}_{rng.randrange(1, 10000)}": "deny" for _ in range(update_count // 2)}
+    updates.update({f"new_rule_{i}": "allow from 192.0.2.0/24" for i in range(update_count - len(updates))})
+    print(f"  {os.path.getsize(config_filename) / 1e6:.0f} MB config, {len(updates):,} updates")
+    try:
+        for label, updater in (("whole file", _update_security_config_reference), ("streaming", update_security_config)):
+            started = time.perf_counter()
+            updater(config_filename, updates)
+            elapsed = time.perf_counter() - started
+            tracemalloc.start() # Separate traced run: tracing slows allocation-heavy code down
+            updater(config_filename, updates)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {label:<11} {elapsed:7.2f}s  peak {peak / 1e6:8.1f} MB")
+    finally:
+        if os.path.exists(config_filename): os.remove(config_filename)
+
+def run_benchmarks():
+    print("="*50)
+    print("BENCHMARK: process_user_list")
+    print("="*50)
+    benchmark_user_list()
+    print("\nBENCHMARK: generate_metrics_report input cache")
+    benchmark_metrics_report()
+    print("\nBENCHMARK: process_security_alerts report writer")
+    benchmark_alert_report_writer()
+    print("\nBENCHMARK: multi-sensor alert filtering")
+    benchmark_multi_sensor_alerts()
+    print("\nBENCHMARK: update_security_config")
+    benchmark_config_update()
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_security_files():
+    all_passed = True
+    previous_directory = os.getcwd()
+    work_directory = tempfile.mkdtemp(prefix="security_files_test_")
+    os.chdir(work_directory) # Test files are created here and removed with the directory
+    try:
+        with open("users.csv", "w") as f:
+            f.write("username,role,email,last_login_date,status\n"
+                    "admin_user,admin,admin@example.com,2023-10-01,active\n"
+                    "regular_user,user,user@example.com,2023-09-28,active\n"
+                    "old_user,user,old@example.com,2022-01-15,inactive\n")
+        with open("alerts.txt", "w") as f:
+            f.write("2023-10-01T09:30:00Z|CRITICAL|dc-01|Ransomware signature detected\n"
+                    "2023-10-01T09:35:00Z|HIGH|firewall-01|Suspicious outbound connection\n"
+                    "2023-10-01T09:40:00Z|LOW|web-01|Certificate expires in 60 days\n")
+
+        try:
+            with open("alerts.txt", "rb") as src, gzip.open("compressed_alerts.txt.gz", "wb") as dst: dst.write(src.read())
+            assert process_security_alerts("compressed_alerts.txt.gz", "compressed_report.txt") == 2
+            with open("compressed_report.txt") as f: assert f.read().startswith("ALERT: 2023-10-01T09:30:00Z - CRITICAL")
+            with open("binary_alerts.txt", "wb") as f: f.write(b"2023-10-01T09:30:00Z|HIGH|\xff\xfe|Bad bytes\n")
+            assert process_security_alerts("binary_alerts.txt", "compressed_report.txt") == -1
+            assert process_security_alerts("missing_alerts.txt", "compressed_report.txt") == -1
+            os.mkdir("rotated_logs")
+            with open("rotated_logs/app.log", "w") as f: f.write("INFO current\n")
+            with gzip.open("rotated_logs/app.log.1.gz", "wt") as f: f.write("INFO rotated")
+            with gzip.open("rotated_logs/auth.log.gz", "wt") as f: f.write("WARNING old\n")
+            with open("rotated_logs/notes.md", "w") as f: f.write("not a log\n")
+            truncated = gzip.compress(b"INFO partial\n" * 5000)
+            with open("rotated_logs/broken.log.gz", "wb") as f: f.write(truncated[:len(truncated) // 2])
+            archived = archive_old_logs("rotated_logs", "rotated_logs/archive.txt")
+            assert archived == ["app.log", "auth.log.gz"], archived
+            with open("rotated_logs/archive.txt") as f: archive = f.read()
+            assert "INFO current\n--- End of app.log ---" in archive and "WARNING old\n" in archive
+            assert "broken.log.gz" not in archive and "INFO partial" not in archive, "partial log left in the archive"
+            assert archive_old_logs("missing_logs", "archive.txt") == []
+            print("✅ Security Files Test 1 (compressed alerts and log archive): PASSED")
+        except AssertionError as e:
+            print(f"❌ Security Files Test 1 (compressed alerts and log archive): FAILED - {e}")
+            all_passed = False
+
+        spill_directory = tempfile.mkdtemp(prefix="user_spill_test_")
+        try:
+            generate_benchmark_users("users_engine_test.csv", 5000)
+            expected_users = _process_user_list_reference("users_engine_test.csv")
+            summary = process_user_list("users_engine_test.csv")
+            assert all(summary[key] == expected_users[key] for key in expected_users), "lists differ from the reference"
+            counts = process_user_list("users_engine_test.csv", mode="count")
+            assert "admin_users" not in counts and counts["admin_user_count"] == len(expected_users["admin_users"])
+            assert counts["active_user_count"] + counts["inactive_user_count"] == counts["total_users"] == 5000
+            sample = process_user_list("users_engine_test.csv", mode="sample", sample_size=50)
+            assert len(sample["active_users"]) == 50 and set(sample["active_users"]) <= set(expected_users["active_users"])
+            spilled = process_user_list("users_engine_test.csv", spill_directory=spill_directory)
+            assert len(spilled["admin_users"]) == len(expected_users["admin_users"]) and "user3" in spilled["admin_users"]
+            assert list(spilled["inactive_users"]) == expected_users["inactive_users"]
+            with open("users.csv", "rb") as src, gzip.open("users_engine_test.csv.gz", "wb") as dst: dst.write(src.read())
+            assert process_user_list("users_engine_test.csv.gz")["admin_users"] == ["admin_user"]
+            with open("users_malformed.csv", "w") as f: f.write("username,role\nbob,user\n")
+            assert process_user_list("users_malformed.csv", spill_directory=spill_directory) is None
+            assert process_user_list("missing_users.csv") is None
+            with open("users_blank_first.csv", "w") as f:
+                f.write("\nusername,role,email,last_login_date,status\nann,admin,a@x.org,2023-10-01,active\n")
+            assert process_user_list("users_blank_first.csv")["total_users"] == 1, "header after a blank line was counted"
+            assert len(os.listdir(spill_directory)) == 3, "a failed run left spill files behind"
+            print("✅ Security Files Test 2 (streaming process_user_list modes): PASSED")
+        except (AssertionError, TypeError) as e:
+            print(f"❌ Security Files Test 2 (streaming process_user_list modes): FAILED - {e}")
+            all_passed = False
+        finally:
+            shutil.rmtree(spill_directory, ignore_errors=True)
+
+        try:
+            clear_input_metrics_cache()
+            generate_benchmark_alerts("metrics_engine_alerts.txt", 16)
+            assert process_security_alerts("metrics_engine_alerts.txt", "filtered_alerts.txt") == 6
+            assert cached_input_metrics("alerts", "metrics_engine_alerts.txt") == {
+                "total_alerts": 16, "high_priority_alert_count": 6, "critical_alert_count": 2}
+            process_user_list("users_engine_test.csv")
+            metrics = generate_metrics_report("users_engine_test.csv", "metrics_engine_alerts.txt", "metrics_engine_report.txt")
+            assert metrics == {"total_users": 5000, "active_user_percentage": 80.0, "admin_user_count": 1666,
+                               "total_alerts": 16, "high_priority_alert_count": 6, "critical_alert_count": 2}
+            # Same size and mtime: the report trusts the cached counts and does not re-read the file
+            stat = os.stat("metrics_engine_alerts.txt")
+            with open("metrics_engine_alerts.txt") as f: edited = f.read().replace("|MEDIUM|", "|HIGH  |")
+            with open("metrics_engine_alerts.txt", "w") as f: f.write(edited)
+            os.utime("metrics_engine_alerts.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            assert generate_metrics_report("users_engine_test.csv", "metrics_engine_alerts.txt",
+                                           "metrics_engine_report.txt")["high_priority_alert_count"] == 6
+            with open("metrics_engine_alerts.txt", "a") as f: f.write("2023-10-02T00:00:00Z|CRITICAL|dc-02|New\n")
+            metrics = generate_metrics_report("users_engine_test.csv", "metrics_engine_alerts.txt", "metrics_engine_report.txt")
+            assert metrics["total_alerts"] == 17 and metrics["high_priority_alert_count"] == 11, "changed file not rescanned"
+            with open("metrics_engine_report.txt") as f: assert "Active User Percentage: 80.0%" in f.read()
+            assert generate_metrics_report("missing_users.csv", "metrics_engine_alerts.txt", "metrics_engine_report.txt") == {}
+            assert generate_metrics_report("users.csv", "missing_alerts.txt", "metrics_engine_report.txt") == {}
+            print("✅ Security Files Test 3 (fused metrics with input cache): PASSED")
+        except (AssertionError, TypeError, KeyError) as e:
+            print(f"❌ Security Files Test 3 (fused metrics with input cache): FAILED - {e}")
+            all_passed = False
+        finally:
+            clear_input_metrics_cache()
+
+        try:
+            generate_benchmark_alerts("writer_engine_alerts.txt", 1000)
+            expected_count = _process_security_alerts_reference("writer_engine_alerts.txt", "writer_engine_expected.txt")
+            with BufferedReportWriter("writer_engine_report.txt", batch_lines=7) as writer:
+                assert scan_security_alerts("writer_engine_alerts.txt", writer)["high_priority_alert_count"] == expected_count
+            assert writer.lines_written == expected_count
+            with open("writer_engine_report.txt") as f, open("writer_engine_expected.txt") as g: assert f.read() == g.read()
+            # A corrupt input must leave the previous atomic report untouched and no temp file behind
+            with open("writer_engine_alerts.txt", "rb") as src, gzip.open("writer_engine_alerts.txt.gz", "wb") as dst:
+                dst.write(src.read())
+            with open("writer_engine_alerts.txt.gz", "r+b") as f: f.truncate(os.path.getsize("writer_engine_alerts.txt.gz") // 2)
+            assert process_security_alerts("writer_engine_alerts.txt.gz", "writer_engine_report.txt", atomic=True) == -1
+            with open("writer_engine_report.txt") as f, open("writer_engine_expected.txt") as g: assert f.read() == g.read()
+            assert not os.path.exists("writer_engine_report.txt.tmp"), "temp report left behind"
+            with open("writer_engine_report.txt", "w") as f: f.write("OLD\n")
+            assert process_security_alerts("missing_alerts.txt", "writer_engine_report.txt") == -1
+            with open("writer_engine_report.txt") as f: assert f.read() == "OLD\n", "missing input truncated the report"
+            # Undecodable input is reported like any other unreadable file instead of raising
+            with open("writer_engine_binary.txt", "wb") as f: f.write(b"2023-10-01T09:30:00Z|HIGH|\xff\xfe|Bad bytes\n")
+            assert process_security_alerts("writer_engine_binary.txt", "writer_engine_report.txt", atomic=True) == -1
+            assert process_security_alerts_many(["writer_engine_binary.txt"], "writer_engine_report.txt", workers=1) == -1
+            assert generate_metrics_report("users.csv", "writer_engine_binary.txt", "metrics_engine_report.txt") == {}
+            assert process_security_alerts("alerts.txt", "writer_engine_report.txt", atomic=True) == 2
+            with open("writer_engine_report.txt") as f: assert f.read().startswith("ALERT: 2023-10-01T09:30:00Z - CRITICAL")
+            print("✅ Security Files Test 4 (batched, atomic alert report writer): PASSED")
+        except AssertionError as e:
+            print(f"❌ Security Files Test 4 (batched, atomic alert report writer): FAILED - {e}")
+            all_passed = False
+
+        try:
+            sensor_files = [f"sensor_engine_{index}.txt" for index in range(3)]
+            for index, f_name in enumerate(sensor_files):
+                generate_benchmark_alerts(f_name, 40, sensor=f"sensor-{index}", start_second=index * 7)
+            total = process_security_alerts_many(sensor_files, "sensor_engine_report.txt", workers=2)
+            expected_lines = []
+            for f_name in sensor_files:
+                process_security_alerts(f_name, "sensor_engine_part.txt")
+                with open("sensor_engine_part.txt") as f: expected_lines.extend(f)
+            with open("sensor_engine_report.txt") as f: merged = f.readlines()
+            assert total == len(expected_lines) == len(merged) and sorted(merged) == sorted(expected_lines)
+            timestamps = [_report_line_timestamp(line) for line in merged]
+            assert timestamps == sorted(timestamps), "merged report is not in timestamp order"
+            assert process_security_alerts_many(sensor_files, "sensor_engine_single.txt", workers=1) == total
+            with open("sensor_engine_single.txt") as f: assert f.readlines() == merged
+            assert process_security_alerts_many(sensor_files + ["missing_alerts.txt"], "sensor_engine_failed.txt") == -1
+            assert not os.path.exists("sensor_engine_failed.txt")
+            assert not any(name.startswith(".alert_parts_") for name in os.listdir(".")), "part files left behind"
+            print("✅ Security Files Test 5 (multi-sensor merge by timestamp): PASSED")
+        except AssertionError as e:
+            print(f"❌ Security Files Test 5 (multi-sensor merge by timestamp): FAILED - {e}")
+            all_passed = False
+
+        try:
+            with open("config_engine_test.ini", "w") as f:
+                f.write("# Firewall\nmode=strict\n#mode=permissive\n\ntimeout = 30\nmode=audit\nlast=1")
+            assert update_security_config("config_engine_test.ini", {"mode": "enforce", "timeout": 60, "added": "yes"})
+            with open("config_engine_test.ini") as f: content = f.read()
+            assert content == ("# Firewall\nmode=enforce\n#mode=permissive\n\ntimeout=60\nmode=enforce\nlast=1\n"
+                               "added=yes\n"), "comments, order or repeated keys not preserved"
+            # The separator before appended keys depends on the rewritten last line, not the original one
+            with open("config_engine_separator.ini", "w") as f: f.write("a=1\nb=2")
+            assert update_security_config("config_engine_separator.ini", {"b": "3", "z": "9"})
+            with open("config_engine_separator.ini") as f: assert f.read() == "a=1\nb=3\nz=9\n"
+            assert update_security_config("missing_config.ini", {"a": "b"}) is False
+            assert not os.path.exists("missing_config.ini")
+            # Concurrent writers: the lock serializes them, so no process loses another's key
+            updates = [{f"worker_key_{index}": str(index)} for index in range(24)]
+            with multiprocessing.Pool(4) as pool:
+                results = pool.starmap(update_security_config, [("config_engine_test.ini", update) for update in updates])
+            with open("config_engine_test.ini") as f: content = f.read()
+            assert all(results) and all(f"worker_key_{index}={index}\n" in content for index in range(24)), "lost update"
+            leftovers = [name for name in os.listdir(".") if name.startswith(".config_engine_") or name.endswith(".lock")]
+            assert not leftovers, f"temporary or lock files left behind: {leftovers}"
+            print("✅ Security Files Test 6 (streaming, atomic, locked config update): PASSED")
+        except AssertionError as e:
+            print(f"❌ Security Files Test 6 (streaming, atomic, locked config update): FAILED - {e}")
+            all_passed = False
+    finally:
+        os.chdir(previous_directory)
+        shutil.rmtree(work_directory, ignore_errors=True)
+    return all_passed
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv: run_benchmarks()
+    else: test_security_files()
@@ -0,0 +1,113 @@
+"""
+====================================================================
+STREAM SAMPLING 🎲 - Bounded first/last/reservoir samples of a stream
+====================================================================
+
+Shared helper for Module 8 (log_scanner.py keeps its critical log lines in
+a StreamSample, security_files.py its sampled usernames).
+
+Keeping every item of a stream that may be millions of items long does not
+scale. StreamSample keeps at most `limit` of them while still counting all
+it has seen, samples of different parts of one stream can be merged (e.g.
+the chunks of a parallel scan), and a sample can be saved to and restored
+from a JSON-friendly dict.
+
+Run `python stream_sampling.py` for the built-in checks.
+"""
+
+import random
+from collections import deque
+
+SAMPLING_MODES = ("first", "last", "reservoir")
+
+class StreamSample:
+    """
+    Keeps at most `limit` items (None = keep all), chosen by `mode`: "first"
+    keeps the earliest items, "last" the most recent ones and "reservoir" a
+    uniform random sample of everything seen. `seen` counts every item added.
+    """
+
+    def __init__(self, limit=None, mode="first", seed=None):
+        if mode not in SAMPLING_MODES: raise ValueError(f"Unknown sampling mode: {mode}")
+        self.limit = limit
+        self.mode = mode
+        self.seen = 0
+        self.items = deque(maxlen=limit) if mode == "last" else []
+        self._random = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if self.limit is None or self.mode == "last" or len(self.items) < self.limit:
+            self.items.append(item)
+        elif self.mode == "reservoir":
+            slot = self._random.randrange(self.seen)
+            if slot < self.limit: self.items[slot] = item
+
+    def merge(self, other):
+        """Fold in the sample of a later part of the same stream."""
+        if self.mode == "reservoir" and self.limit is not None:
+            # Draw from both samples in proportion to how many items each one saw
+            mine, theirs = list(self.items), list(other.items)
+            self._random.shuffle(mine); self._random.shuffle(theirs)
+            mine_left, theirs_left = self.seen, other.seen
+            merged = []
+            while len(merged) < self.limit and (mine or theirs):
+                if theirs and (not mine or self._random.randrange(mine_left + theirs_left) >= mine_left):
+                    merged.append(theirs.pop()); theirs_left -= 1
+                else:
+                    merged.append(mine.pop()); mine_left -= 1
+            self.items = merged
+        elif self.limit is None or self.mode == "last":
+            self.items.extend(other.items)
+        else:
+            self.items.extend(list(other.items)[:self.limit - len(self.items)])
+        self.seen += other.seen
+
+    def values(self):
+        return list(self.items)
+
+    def to_checkpoint(self):
+        return {"limit": self.limit, "mode": self.mode, "seen": self.seen, "items": list(self.items)}
+
+    @classmethod
+    def from_checkpoint(cls, state):
+        sample = cls(state["limit"], state["mode"])
+        sample.seen = state["seen"]
+        sample.items.extend(state["items"])
+        return sample
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def test_stream_sampling():
+    try:
+        first, last, everything = StreamSample(3), StreamSample(3, "last"), StreamSample()
+        for i in range(10):
+            for sample in (first, last, everything): sample.add(i)
+        assert first.values() == [0, 1, 2] and last.values() == [7, 8, 9] and everything.values() == list(range(10))
+        assert first.seen == last.seen == 10
+        sample = StreamSample(limit=10, mode="reservoir", seed=7)
+        for i in range(1000): sample.add(i)
+        assert len(sample.values()) == 10 and sample.seen == 1000
+        other = StreamSample(limit=10, mode="reservoir", seed=8)
+        for i in range(1000, 1500): other.add(i)
+        sample.merge(other)
+        assert len(sample.values()) == 10 and sample.seen == 1500
+        restored = StreamSample.from_checkpoint(last.to_checkpoint())
+        restored.add(10)
+        assert restored.values() == [8, 9, 10] and restored.seen == 11, "checkpoint lost the 'last' bound"
+        try:
+            StreamSample(mode="newest")
+            raise AssertionError("unknown mode accepted")
+        except ValueError:
+            pass
+        print("✅ Stream Sampling Test (first/last/reservoir samples): PASSED")
+        return True
+    except AssertionError as e:
+        print(f"❌ Stream Sampling Test (first/last/reservoir samples): FAILED - {e}")
+        return False
+
+if __name__ == "__main__":
+    test_stream_sampling()
@@ -0,0 +1,80 @@
+"""
+====================================================================
+WORKER POOLS 🧵 - Forked process pools with a serial fallback
+====================================================================
+
+Shared helper for Modules 7 and 8 (log_scanner.py, password_audit.py,
+security_files.py and security_assessment.py).
+
+Under the "spawn" and "forkserver" start methods every worker re-imports the
+__main__ script, and the lesson files run their demos and tests at import
+time, so a pool started from a lesson would run the lesson again in each
+worker. Pools are therefore always made from the "fork" context, whatever the
+platform default is. Where fork is not available (e.g. Windows) no pool is
+made and the work runs serially in the calling process.
+
+Run `python worker_pools.py` for the built-in checks.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+
+def process_pool_usable():
+    """True where worker processes can be forked."""
+    return "fork" in multiprocessing.get_all_start_methods()
+
+def fork_process_pool(processes):
+    """A multiprocessing.Pool of forked workers, or None for one worker or where fork is unavailable."""
+    if processes <= 1 or not process_pool_usable(): return None
+    return multiprocessing.get_context("fork").Pool(processes)
+
+def fork_process_executor(max_workers):
+    """A concurrent.futures.ProcessPoolExecutor of forked workers, or None where fork is unavailable."""
+    if not process_pool_usable(): return None
+    return concurrent.futures.ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("fork"))
+
+def imap_in_processes(function, tasks, processes=None):
+    """
+    Yield function(task) for each task, in order. With more than one process
+    (None means one per CPU) the tasks go to a pool of forked workers;
+    otherwise, or where fork is unavailable, they run here one by one.
+    `tasks` is consumed lazily either way.
+    """
+    pool = fork_process_pool((os.cpu_count() or 1) if processes is None else processes)
+    if pool is None:
+        yield from map(function, tasks)
+        return
+    with pool:
+        yield from pool.imap(function, tasks)
+
+
+# ============================================================================
+# BUILT-IN TESTS
+# ============================================================================
+
+def _worker_pid_and_square(value):
+    return os.getpid(), value * value
+
+def test_worker_pools():
+    try:
+        expected = [value * value for value in range(20)]
+        serial = list(imap_in_processes(_worker_pid_and_square, range(20), processes=1))
+        assert [square for _, square in serial] == expected
+        assert {pid for pid, _ in serial} == {os.getpid()}, "one process should not start a pool"
+        pooled = list(imap_in_processes(_worker_pid_and_square, iter(range(20)), processes=2))
+        assert [square for _, square in pooled] == expected, "results out of order"
+        if process_pool_usable():
+            assert os.getpid() not in {pid for pid, _ in pooled}, "tasks did not reach the workers"
+            executor = fork_process_executor(1)
+            with executor: assert executor.submit(_worker_pid_and_square, 3).result()[1] == 9
+        else:
+            assert fork_process_pool(4) is None and fork_process_executor(1) is None
+        print("✅ Worker Pools Test (forked pool and serial fallback): PASSED")
+        return True
+    except AssertionError as e:
+        print(f"❌ Worker Pools Test (forked pool and serial fallback): FAILED - {e}")
+        return False
+
+if __name__ == "__main__":
+    test_worker_pools()